@@ -2,15 +2,12 @@
 -- The parameter_domain values were obtained from a cross product of the domains of each variable (i.e. modelling_domain and kind) and then attempting to construct
 -- a library and filtering out any pair that caused an exception
 
-/*
-class FdwLibrary(ForeignDataWrapper):
-    def __init__(self, options, columns):
-        super(FdwLibrary, self).__init__(options, columns)
-        self.columns = columns
-        self.options = options.copy()
-        self.library = self.options['library']
-
-*/
+-- The wrapper is fdw_library.FdwLibrary (Multicorn).  Quals on the parameter columns are
+-- intersected with parameter_domain and quals on the axes select rows, so a selective query
+-- constructs and evaluates only the libraries and rows it can return.
+CREATE SERVER library_srv FOREIGN DATA WRAPPER multicorn OPTIONS (
+    wrapper 'fdw_library.FdwLibrary'
+);
 
 CREATE foreign table "foobar.LoadingsLib" -- we use the symbol of the callable to create the library as the name of the table.
 ( id integer, -- from the axes
@@ -24,10 +21,13 @@ CREATE foreign table "foobar.LoadingsLib" -- we use the symbol of the callable t
   -- etc. etc.
 ) server library_srv options(
     library 'foobar.LoadingsLib', -- this is the name of the callable to construct the library
+    executor 'ipyparallel', -- fan parameter tuples out to the cluster in the user mapping below ('local' for a process pool, 'serial' to evaluate in the backend)
+    -- python_executable '/usr/bin/python3', -- with executor 'local': the interpreter for the pool's workers (the backend's sys.executable is postgres itself)
+    cache_ttl '300', -- seconds an evaluated library is served from the backend's column cache ('0' disables)
     parameters '["modelling_domain","kind"]', -- the parameters as a JSON-encoded list
     axes '[{"dtype": "date:date[Basic/day]", "name": "date"},{"dtype": "id:integer", "name": "id"}]', -- axes as JSON-encoded metadata
     -- A list of all legitimate parameter tuples
-    parameter_domain '[["D","COMPUTED"], ["D, "HISTORICAL"], ["G", "COMPUTED"],
+    parameter_domain '[["D","COMPUTED"], ["D", "HISTORICAL"], ["G", "COMPUTED"],
      ["G","HISTORICAL"], ["GO", "HISTORICAL"], ["JC", "COMPUTED"],
      ["J","HISTORICAL"], ["JO", "HISTORICAL"], ["US", "COMPUTED"],
      ["U", "HISTORICAL"], ["UO", "HISTORICAL"]]'
@@ -0,0 +1,475 @@
+"""
+Multicorn foreign data wrapper that exposes a FooBar-style library as a table.
+
+This is the executor for the DDL in fdw_demo.sql.  A foreign table there
+declares:
+
+  library           dotted name of the callable that constructs a library
+  parameters        JSON list of the constructor's keyword arguments; each is
+                    also a column of the table
+  axes              JSON list of {"name", "dtype"}; each axis is a column
+  parameter_domain  JSON list of every parameter tuple the callable accepts
+
+and every other column is a node of the library.
+
+The wrapper assumes this protocol from the constructed library:
+
+  lib = load_callable(options["library"])(**params)
+  lib.axes()                -> {axis name: sequence of values}, one entry per
+                               row of the library's long (axis-indexed) form
+  lib.evaluate(nodes, rows) -> {node name: sequence of values} for the given
+                               row positions only
+
+A scan pushes the query's quals down in two stages before anything is
+evaluated.  Quals on parameter columns are intersected with
+parameter_domain, so only the tuples that can match are constructed; with
+``WHERE modelling_domain = 'G' AND kind = 'COMPUTED'`` that is one library
+instead of eleven.  Quals on axis columns then select row positions, and
+only those rows are evaluated and materialised.  PostgreSQL re-checks every
+qual on the rows returned, so pushdown only has to be conservative, never
+exact.
+
+The surviving parameter tuples are evaluated concurrently when the
+``executor`` option asks for it, and rows are streamed back in completion
+order, so a wide query takes about as long as its slowest library:
+
+  executor 'serial'       evaluate in the backend, one tuple at a time (default)
+  executor 'local'        a local process pool (``max_workers`` processes),
+                          standing in for the cluster; ``python_executable``
+                          names the interpreter the workers run, since the
+                          backend's own sys.executable is postgres
+  executor 'ipyparallel'  a load-balanced view on the ipyparallel cluster
+                          described by the user mapping's ``ipyparallel``
+                          option; its task_scheme (leastload) picks the engine
+
+Only the node columns a query references are evaluated.  Evaluated
+libraries are cached in the backend as columns, keyed by (library,
+parameter tuple, as-of date, axis selection), where the selection is the
+axis quals the rows were evaluated under.  A cold query still pushes its
+axis quals down; a repeat of the same selection, or a subset of its
+columns, is served from the cache, and a query without axis quals caches
+all rows, from which any later selection is sliced.  Nodes a cached entry
+is missing are evaluated and added to it.
+
+  cache_ttl        seconds a cached library stays valid (default 300; 0 disables)
+  cache_max_cells  total rows x columns kept before least recently used
+                   libraries are evicted (default 5,000,000)
+
+Install alongside Multicorn on the database server and create the server as
+in fdw_demo.sql:
+    CREATE SERVER library_srv FOREIGN DATA WRAPPER multicorn
+        OPTIONS (wrapper 'fdw_library.FdwLibrary');
+"""
+
+import datetime as dt
+import importlib
+import json
+import multiprocessing
+import operator
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from multicorn import ForeignDataWrapper
+from multicorn.utils import WARNING, log_to_postgres
+
+OPERATORS = {
+    "=": operator.eq,
+    "<>": operator.ne,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def load_callable(dotted_name):
+    """Import 'package.module.attr' and return attr."""
+    module_name, _, attr = dotted_name.rpartition(".")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _coerce_date(value):
+    if isinstance(value, dt.datetime):
+        return value.date()
+    if isinstance(value, str):
+        return dt.date.fromisoformat(value[:10])
+    return value
+
+
+def axis_coercion(dtype):
+    """Function that brings library axis values to the column's SQL type.
+
+    Axis dtypes look like "date:date[Basic/day]" or "id:integer"; the part
+    after the colon names the value type.
+    """
+    kind = dtype.split(":", 1)[-1]
+    if kind.startswith("date"):
+        return _coerce_date
+    if kind.startswith("int"):
+        return int
+    if kind.startswith(("float", "double", "real")):
+        return float
+    return lambda v: v
+
+
+def qual_spec(qual):
+    """Picklable (field, operator, value, is_list) form of a Multicorn qual."""
+    return (qual.field_name, qual.operator, qual.value, qual.is_list_operator)
+
+
+def qual_predicate(spec, coerce=lambda v: v):
+    """A value -> bool test for one qual spec, or None if unsupported.
+
+    Handles the comparison operators and their array forms
+    (col = ANY(...), col IN (...), col <> ALL(...)).
+    """
+    _, operator_, value, is_list = spec
+    if is_list:
+        op_name, use_any = operator_
+        op = OPERATORS.get(op_name)
+        if op is None:
+            return None
+        values = [coerce(v) for v in value]
+        combine = any if use_any else all
+        return lambda v: combine(op(v, q) for q in values)
+    op = OPERATORS.get(operator_)
+    if op is None or value is None:
+        return None
+    target = coerce(value)
+    return lambda v: v is not None and op(v, target)
+
+
+def select_rows(axis_values, axes, axis_quals):
+    """Row positions whose axis values pass every axis qual."""
+    coercions = {a["name"]: axis_coercion(a["dtype"]) for a in axes}
+    n = len(next(iter(axis_values.values()), ()))
+    rows = range(n)
+    for spec in axis_quals:
+        coerce = coercions[spec[0]]
+        predicate = qual_predicate(spec, coerce)
+        if predicate is None:
+            continue
+        values = axis_values[spec[0]]
+        rows = [i for i in rows if predicate(coerce(values[i]))]
+        if not rows:
+            break
+    return list(rows)
+
+
+def evaluate_library(library, kwargs, axes, axis_quals, nodes):
+    """Construct one library, select rows on its axes and evaluate `nodes`.
+
+    Runs in the backend or on a worker, so it takes only picklable
+    arguments and returns columns, not rows:
+    {axis or node name: list of values for the selected rows}.
+    """
+    lib = load_callable(library)(**kwargs)
+    axis_values = lib.axes()
+    rows = select_rows(axis_values, axes, axis_quals)
+    columns = {}
+    for a in axes:
+        coerce = axis_coercion(a["dtype"])
+        values = axis_values[a["name"]]
+        columns[a["name"]] = [coerce(values[i]) for i in rows]
+    if rows and nodes:
+        evaluated = lib.evaluate(nodes, rows)
+        for node in nodes:
+            columns[node] = list(evaluated[node])
+    else:
+        for node in nodes:
+            columns[node] = []
+    return columns
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def selection_key(axis_quals):
+    """Hashable, order-independent form of a scan's axis quals ((): all rows)."""
+    return tuple(sorted((tuple(_freeze(part) for part in spec) for spec in axis_quals), key=repr))
+
+
+def ipyparallel_executor(connection_info):
+    """concurrent.futures executor over a load-balanced ipyparallel view."""
+    import ipyparallel
+
+    info = json.loads(connection_info)
+    # Client takes connection info as a file, the same JSON as ipcontroller writes
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(info, f)
+    try:
+        client = ipyparallel.Client(url_file=f.name)
+    finally:
+        os.unlink(f.name)
+    return client.load_balanced_view().executor
+
+
+class ColumnCache:
+    """LRU cache of evaluated libraries as {column: list} with TTL and a size cap.
+
+    Size is counted in cells (rows x columns) across all entries; the least
+    recently used entries are evicted once the cap is exceeded, and entries
+    older than `ttl` seconds are dropped when next looked up.
+    """
+
+    def __init__(self, ttl, max_cells):
+        self.ttl = ttl
+        self.max_cells = max_cells
+        self.cells = 0
+        self._entries = OrderedDict()  # key -> (stored_at, columns, cells)
+
+    @staticmethod
+    def _size(columns):
+        return sum(len(values) for values in columns.values())
+
+    def get(self, key):
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        stored_at, columns, cells = item
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self.cells -= cells
+            return None
+        self._entries.move_to_end(key)
+        return columns
+
+    def put(self, key, columns):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.cells -= old[2]
+        cells = self._size(columns)
+        self._entries[key] = (time.monotonic(), columns, cells)
+        self.cells += cells
+        while self.cells > self.max_cells and len(self._entries) > 1:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.cells -= evicted
+
+
+class FdwLibrary(ForeignDataWrapper):
+    """Foreign table over a parameterised library (see module docstring)."""
+
+    def __init__(self, options, columns):
+        super(FdwLibrary, self).__init__(options, columns)
+        self.columns = columns
+        self.options = options.copy()
+        self.library = self.options["library"]
+        self.parameters = json.loads(self.options["parameters"])
+        self.axes = json.loads(self.options["axes"])
+        self.axis_names = [a["name"] for a in self.axes]
+        self.axis_coerce = {a["name"]: axis_coercion(a["dtype"]) for a in self.axes}
+        self.parameter_domain = [
+            tuple(t) for t in json.loads(self.options["parameter_domain"])
+        ]
+        # Everything that is not a parameter or an axis is a library node
+        keys = set(self.parameters) | set(self.axis_names)
+        self.node_columns = [c for c in columns if c not in keys]
+        # Planner estimate of rows per library, overridable per table
+        self.rows_per_library = int(self.options.get("rows_per_library", 1000))
+        self.executor_kind = self.options.get("executor", "serial")
+        self._executor = None
+        ttl = float(self.options.get("cache_ttl", 300))
+        self.cache = (
+            ColumnCache(ttl, int(self.options.get("cache_max_cells", 5_000_000)))
+            if ttl > 0
+            else None
+        )
+
+    # -- planning ----------------------------------------------------------
+    def get_rel_size(self, quals, columns):
+        tuples = len(self.surviving_parameters(quals))
+        axis_quals = [q for q in quals if q.field_name in self.axis_coerce]
+        # Each axis qual is assumed to keep a tenth of the rows
+        rows = tuples * self.rows_per_library * (0.1 ** len(axis_quals))
+        return (max(int(rows), 1), 8 * len(columns))
+
+    def get_path_keys(self):
+        # Fixing the parameters selects one library; fixing the axes as well
+        # selects a single row
+        return [
+            (tuple(self.parameters), self.rows_per_library),
+            (tuple(self.parameters) + tuple(self.axis_names), 1),
+        ]
+
+    # -- pushdown ----------------------------------------------------------
+    def surviving_parameters(self, quals):
+        """Parameter tuples from parameter_domain that satisfy the quals."""
+        tests = []
+        for qual in quals:
+            if qual.field_name in self.parameters:
+                predicate = qual_predicate(qual_spec(qual))
+                if predicate is not None:
+                    tests.append((self.parameters.index(qual.field_name), predicate))
+        return [
+            params
+            for params in self.parameter_domain
+            if all(predicate(params[i]) for i, predicate in tests)
+        ]
+
+    def axis_quals(self, quals):
+        return [qual_spec(q) for q in quals if q.field_name in self.axis_coerce]
+
+    # -- scan --------------------------------------------------------------
+    def executor(self):
+        """The worker pool for this table, created on first use (or None)."""
+        if self._executor is None and self.executor_kind != "serial":
+            if self.executor_kind == "ipyparallel":
+                self._executor = ipyparallel_executor(self.options["ipyparallel"])
+            elif self.executor_kind == "local":
+                max_workers = self.options.get("max_workers")
+                # never fork a PostgreSQL backend
+                context = multiprocessing.get_context("spawn")
+                context.set_executable(self.python_executable())
+                self._executor = ProcessPoolExecutor(
+                    max_workers=int(max_workers) if max_workers else None,
+                    mp_context=context,
+                )
+            else:
+                raise ValueError(f"unknown executor {self.executor_kind!r}")
+        return self._executor
+
+    def python_executable(self):
+        """Interpreter for 'local' workers.  Spawn starts sys.executable,
+        which inside a backend is the postgres binary, not Python."""
+        executable = self.options.get("python_executable")
+        if executable:
+            return executable
+        if "python" not in os.path.basename(sys.executable).lower():
+            raise ValueError(
+                "executor 'local' needs the python_executable option "
+                f"(sys.executable is {sys.executable!r})"
+            )
+        return sys.executable
+
+    def execute(self, quals, columns):
+        """Scan: yield row dicts for the quals, evaluating only `columns`.
+
+        A cold, selective query evaluates only the rows its axis quals select:
+
+        >>> import sys, types
+        >>> class Counting:
+        ...     rows = []
+        ...     def __init__(self, kind): pass
+        ...     def axes(self): return {"id": list(range(9))}
+        ...     def evaluate(self, nodes, rows):
+        ...         Counting.rows.append(list(rows))
+        ...         return {n: [float(i) for i in rows] for n in nodes}
+        >>> sys.modules["counting"] = types.SimpleNamespace(Counting=Counting)
+        >>> fdw = FdwLibrary({
+        ...     "library": "counting.Counting", "parameters": '["kind"]',
+        ...     "axes": '[{"name": "id", "dtype": "id:integer"}]',
+        ...     "parameter_domain": '[["A"]]',
+        ... }, {"kind": None, "id": None, "x": None})
+        >>> id_in = types.SimpleNamespace(
+        ...     field_name="id", operator=("=", True), value=[3, 4], is_list_operator=True)
+        >>> [row["x"] for row in fdw.execute([id_in], ["id", "x"])]
+        [3.0, 4.0]
+        >>> Counting.rows
+        [[3, 4]]
+        >>> [row["x"] for row in fdw.execute([id_in], ["id", "x"])]  # cached
+        [3.0, 4.0]
+        >>> Counting.rows
+        [[3, 4]]
+        """
+        tuples = self.surviving_parameters(quals)
+        axis_quals = self.axis_quals(quals)
+        # Only the node columns the query references are evaluated
+        nodes = [c for c in self.node_columns if c in columns]
+
+        if self.cache is None:
+            jobs = [(params, axis_quals, nodes) for params in tuples]
+            for params, columns_ in self.evaluate(jobs):
+                yield from self.rows(params, columns_, nodes)
+            return
+
+        # An entry holds the rows of one axis selection; the all-rows entry
+        # (selection ()) can serve any selection by slicing.  Misses are
+        # evaluated with the axis quals pushed down, as without the cache.
+        as_of = dt.date.today()
+        selection = selection_key(axis_quals)
+        jobs = []
+        for params in tuples:
+            entry = self.cache.get((self.library, params, as_of, selection))
+            if entry is not None and all(n in entry for n in nodes):
+                yield from self.rows(params, entry, nodes)
+                continue
+            full = self.cache.get((self.library, params, as_of, ())) if selection else None
+            if full is not None and all(n in full for n in nodes):
+                yield from self.rows(params, self.slice(full, axis_quals, nodes), nodes)
+                continue
+            missing = nodes if entry is None else [n for n in nodes if n not in entry]
+            jobs.append((params, axis_quals, missing))
+        for params, columns_ in self.evaluate(jobs):
+            key = (self.library, params, as_of, selection)
+            entry = self.cache.get(key) or {}
+            entry.update(columns_)
+            self.cache.put(key, entry)
+            yield from self.rows(params, entry, nodes)
+
+    def evaluate(self, jobs):
+        """Run (params, axis_quals, nodes) jobs; yield (params, columns) as each completes."""
+        executor = self.executor() if len(jobs) > 1 else None
+
+        if executor is None:
+            for params, axis_quals, nodes in jobs:
+                kwargs = dict(zip(self.parameters, params))
+                try:
+                    yield params, evaluate_library(self.library, kwargs, self.axes, axis_quals, nodes)
+                except Exception as e:
+                    self.report_failure(kwargs, e)
+            return
+
+        futures = {}
+        for params, axis_quals, nodes in jobs:
+            kwargs = dict(zip(self.parameters, params))
+            future = executor.submit(
+                evaluate_library, self.library, kwargs, self.axes, axis_quals, nodes
+            )
+            futures[future] = params
+        try:
+            # Stream each library's rows as soon as it is done
+            for future in as_completed(futures):
+                params = futures[future]
+                try:
+                    columns_ = future.result()
+                except Exception as e:
+                    self.report_failure(dict(zip(self.parameters, params)), e)
+                    continue
+                yield params, columns_
+        finally:
+            # The scan may be abandoned early (LIMIT); drop queued work
+            for future in futures:
+                future.cancel()
+
+    def slice(self, entry, axis_quals, nodes):
+        """Select rows from a cached library's columns by the axis quals."""
+        rows = select_rows(entry, self.axes, axis_quals)
+        return {
+            name: [entry[name][i] for i in rows]
+            for name in self.axis_names + nodes
+        }
+
+    def report_failure(self, kwargs, error):
+        # parameter_domain was built by filtering out failing tuples, so
+        # this is unexpected; skip the library rather than fail the query
+        log_to_postgres(f"{self.library}({kwargs}) failed: {error}", WARNING)
+
+    def rows(self, params, columns, nodes):
+        """Turn one library's columns into row dicts."""
+        kwargs = dict(zip(self.parameters, params))
+        n = len(columns[self.axis_names[0]]) if self.axis_names else 0
+        for j in range(n):
+            row = dict(kwargs)
+            for name in self.axis_names:
+                row[name] = columns[name][j]
+            for node in nodes:
+                row[node] = columns[node][j]
+            yield row
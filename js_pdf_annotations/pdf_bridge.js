@@ -0,0 +1,43 @@
+/**
+ * pdf_bridge.js — UserWorld bridge for pdf-viewer.html
+ *
+ * Injected into UserWorld by pdf_bridge.py.  Same relay as ps_bridge.js:
+ *
+ *   Viewer → Python:  Listens for __pdf_event__ on document,
+ *                     calls backend.onPdfEvent(JSON.stringify(detail))
+ *
+ *   Python → Viewer:  Subscribes to backend.commandRequested signal,
+ *                     dispatches __pdf_command__ CustomEvent with parsed JSON detail
+ *
+ * The viewer's command handlers live in pdf-viewer.html (MainWorld) because
+ * they need PDF.js and the loaded document.
+ */
+(function () {
+    "use strict";
+
+    new QWebChannel(qt.webChannelTransport, function (channel) {
+        var backend = channel.objects.backend;
+        backend.log("PDF bridge connected in UserWorld");
+
+        // Viewer → Python: forward CustomEvents to Python via QWebChannel slot
+        document.addEventListener("__pdf_event__", function (e) {
+            backend.onPdfEvent(JSON.stringify(e.detail));
+        });
+
+        // Python → Viewer: forward signal to CustomEvent on shared DOM
+        backend.commandRequested.connect(function (jsonStr) {
+            var detail;
+            try {
+                detail = JSON.parse(jsonStr);
+            } catch (err) {
+                backend.log("Failed to parse command JSON: " + err);
+                return;
+            }
+            document.dispatchEvent(
+                new CustomEvent("__pdf_command__", { detail: detail })
+            );
+        });
+
+        backend.log("PDF bridge ready");
+    });
+})();
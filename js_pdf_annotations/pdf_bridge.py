@@ -0,0 +1,332 @@
+"""
+PDF viewer ↔ Qt WebEngine Bridge launcher.
+
+Same architecture as ps_bridge.py / map_bridge.py (ConsolePage, Backend,
+QWebChannel in UserWorld, script injection) but hard-wired to
+pdf-viewer.html and pdf_bridge.js in this directory.
+
+PDFs are served to the viewer by pdf_server.PdfByteServer, which answers
+HTTP Range requests from a memory-mapped file, so PDF.js loads large
+documents progressively instead of reading the whole file up front.
+
+Usage:
+    python pdf_bridge.py [pdf_file] [--overlays boxes.csv]
+
+Example:
+    uv run python js_pdf_annotations/pdf_bridge.py \
+        js_pdf_annotations/annotated-document.pdf
+
+Once running, type JSON command strings at the prompt:
+    {"command": "open", "path": "/path/to/other.pdf"}
+    {"command": "extract-annotations"}
+    {"command": "extract-annotations", "concurrency": 16}
+    {"command": "load-url", "url": "file:///path/to/other.pdf"}
+    {"command": "set-scale", "scale": 2.0}
+    {"command": "set-mode", "mode": "continuous"}
+    {"command": "clear-overlays"}
+    {"command": "bake-overlays"}
+
+--overlays pushes a CSV of bounding boxes (columns: page, x0, y0, x1, y1
+and optionally color, alpha, label) onto the overlay layer as soon as the
+PDF has loaded.  Coordinates are page coordinates — PDF points, origin
+top-left — the same as extract-annotations returns.
+
+Ctrl+D (EOF) quits cleanly.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import threading
+from itertools import islice
+from pathlib import Path
+
+from PySide6.QtCore import QFile, QIODeviceBase, QObject, QUrl, Signal, Slot
+from PySide6.QtWidgets import QApplication
+from PySide6.QtWebChannel import QWebChannel
+from PySide6.QtWebEngineCore import QWebEngineScript, QWebEngineSettings
+from PySide6.QtWebEngineWidgets import QWebEngineView
+
+HERE = Path(__file__).resolve().parent
+VIEWER_HTML = HERE / "pdf-viewer.html"
+BRIDGE_JS = HERE / "pdf_bridge.js"
+
+# pdf_server and event_log live with the other Python-side helpers
+sys.path.insert(0, str(HERE.parent / "python_js_purescript_integration"))
+import event_log  # noqa: E402
+from event_log import ConsolePage  # noqa: E402
+from pdf_server import PdfByteServer  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# Annotation payload helpers
+# ---------------------------------------------------------------------------
+def annotation_records(payload):
+    """Expand the columnar payload from extractAnnotations() into row dicts.
+
+    Coordinates are PDF points in page space: origin top-left, rotation
+    applied, so (x0, y0) is the top-left corner of the annotation.
+    """
+    subtypes = payload["subtypes"]
+    rect = payload["rect"]
+    for i in range(payload["count"]):
+        x0, y0, x1, y1 = rect[4 * i : 4 * i + 4]
+        yield dict(
+            page=payload["page"][i],
+            subtype=subtypes[payload["subtype"][i]],
+            x0=x0,
+            y0=y0,
+            x1=x1,
+            y1=y1,
+            id=payload["id"][i],
+            contents=payload["contents"][i],
+            title=payload["title"][i],
+            color=payload["color"][i],
+        )
+
+
+def annotation_report(payload, nbytes, limit=20):
+    """Summary line plus the first ``limit`` annotations, for the log."""
+    counts = {}
+    for page in payload["page"]:
+        counts[page] = counts.get(page, 0) + 1
+    lines = [
+        f"annotations: {payload['count']} on {len(counts)} of "
+        f"{payload['numPages']} pages ({payload['elapsedMs']} ms, {nbytes} bytes)"
+    ]
+    for rec in islice(annotation_records(payload), limit):
+        lines.append(
+            f"    p{rec['page']:<4} {rec['subtype']:<10} "
+            f"[{rec['x0']:.1f}, {rec['y0']:.1f}, {rec['x1']:.1f}, {rec['y1']:.1f}] "
+            f"{rec['contents'] or ''}"
+        )
+    if payload["count"] > limit:
+        lines.append(f"    ... {payload['count'] - limit} more")
+    return "\n".join(lines)
+
+
+def overlay_batch(boxes):
+    """Pack (page, (x0, y0, x1, y1), color, alpha, label) tuples into the
+    columnar batch that the viewer's add-overlays command expects."""
+    batch = dict(page=[], rect=[], color=[], alpha=[], label=[])
+    for page, (x0, y0, x1, y1), color, alpha, label in boxes:
+        batch["page"].append(int(page))
+        batch["rect"].extend((float(x0), float(y0), float(x1), float(y1)))
+        batch["color"].append(color or "#ff0000")
+        batch["alpha"].append(0.3 if alpha is None else float(alpha))
+        batch["label"].append(label or None)
+    return batch
+
+
+def read_overlay_csv(path):
+    """Read bounding boxes from a CSV with page, x0, y0, x1, y1 and optional
+    color, alpha, label columns (e.g. exported from the spreadsheet)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield (
+                row["page"],
+                (row["x0"], row["y0"], row["x1"], row["y1"]),
+                row.get("color"),
+                row.get("alpha") or None,
+                row.get("label"),
+            )
+
+
+# ---------------------------------------------------------------------------
+# Backend — Python object exposed to UserWorld JS via QWebChannel
+# ---------------------------------------------------------------------------
+class Backend(QObject):
+    # Signal for Python → JS communication via QWebChannel
+    commandRequested = Signal(str)
+
+    def __init__(self, server, initial_pdf=None, initial_overlays=None, parent=None):
+        super().__init__(parent)
+        self.ready = False
+        self.server = server
+        self.initial_pdf = initial_pdf
+        self.initial_overlays = initial_overlays
+        # Most recent extract-annotations payload (columnar, see annotation_records)
+        self.annotations = None
+
+    @Slot(str)
+    def log(self, message):
+        event_log.get_log().info("bridge", message)
+        if "ready" in message.lower():
+            self.ready = True
+            if self.initial_pdf is not None:
+                self.open_pdf(self.initial_pdf)
+                self.initial_pdf = None
+
+    @Slot(str)
+    def onPdfEvent(self, event_json):
+        log = event_log.get_log()
+        try:
+            evt = json.loads(event_json)
+        except json.JSONDecodeError:
+            log.warning("PDF", "%s", event_json)
+            return
+
+        etype = evt.get("type", "?")
+        if etype == "annotations":
+            self.annotations = evt["payload"]
+            if log.enabled(event_log.INFO, "PDF"):
+                log.info("PDF", "%s", annotation_report(self.annotations, len(event_json)))
+        elif etype == "loaded":
+            log.info("PDF", "loaded: %s (%s pages)", evt.get("name"), evt.get("numPages"))
+            if self.initial_overlays:
+                self.push_overlays(self.initial_overlays)
+                log.info("PDF", "pushed %d overlay box(es)", len(self.initial_overlays))
+                self.initial_overlays = None
+        elif etype == "overlays-baked":
+            log.info("PDF", "baked %s overlay(s) into the PDF", evt.get("count"))
+        elif etype == "error":
+            log.error("PDF", "%s", evt.get("message", event_json))
+        else:
+            log.info("PDF", "%s: %s", etype, event_json)
+
+    def send(self, command):
+        self.commandRequested.emit(json.dumps(command))
+
+    def open_pdf(self, path):
+        """Register a PDF with the byte server and load it into the viewer."""
+        path = Path(path).expanduser().resolve()
+        url = self.server.add(path)
+        self.send({"command": "load-url", "url": url, "name": path.name})
+        print(f"  Serving {path.name} at {url}", flush=True)
+
+    def push_overlays(self, boxes, replace=False):
+        """Draw bounding boxes on the overlay layer in one batched command.
+
+        boxes: iterable of (page, (x0, y0, x1, y1), color, alpha, label).
+        Nothing is written into the PDF until a bake-overlays command.
+        """
+        self.send({
+            "command": "set-overlays" if replace else "add-overlays",
+            "overlays": overlay_batch(boxes),
+        })
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def read_qwebchannel_js():
+    """Read the bundled qwebchannel.js from Qt resources."""
+    f = QFile(":/qtwebchannel/qwebchannel.js")
+    if not f.open(QIODeviceBase.OpenModeFlag.ReadOnly):
+        raise RuntimeError("Failed to open qwebchannel.js from Qt resources")
+    content = f.readAll().data().decode("utf-8")
+    f.close()
+    return content
+
+
+def stdin_loop(backend, app):
+    """Background thread: read JSON command strings from stdin, emit via signal."""
+    while True:
+        try:
+            line = input("\n> ").strip()
+        except EOFError:
+            print("\n  EOF — quitting.", flush=True)
+            app.quit()
+            return
+        if not line:
+            continue
+        # Validate JSON
+        try:
+            cmd = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"  Invalid JSON: {e}", flush=True)
+            continue
+        # "open" is handled in Python: the file has to be registered with
+        # the byte server before the viewer can fetch it
+        if isinstance(cmd, dict) and cmd.get("command") == "open":
+            try:
+                backend.open_pdf(cmd["path"])
+            except (KeyError, OSError) as e:
+                print(f"  Error: {e}", flush=True)
+            continue
+        backend.commandRequested.emit(line)
+        print(f"  Sent: {line}", flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="PDF viewer ↔ Qt WebEngine Bridge launcher."
+    )
+    parser.add_argument("pdf_file", nargs="?", help="PDF to open once the bridge is ready")
+    parser.add_argument(
+        "--overlays", metavar="CSV",
+        help="CSV of bounding boxes to draw on the overlay layer once the PDF loads"
+    )
+    event_log.add_arguments(parser)
+    args = parser.parse_args()
+
+    initial_overlays = list(read_overlay_csv(args.overlays)) if args.overlays else None
+
+    initial_pdf = None
+    if args.pdf_file:
+        initial_pdf = Path(args.pdf_file).expanduser().resolve()
+        if not initial_pdf.exists():
+            print(f"PDF not found: {initial_pdf}", file=sys.stderr)
+            sys.exit(1)
+
+    event_log.configure_from_args(args)
+    app = QApplication(sys.argv)
+
+    # --- Page & view -----------------------------------------------------
+    page = ConsolePage()
+    view = QWebEngineView()
+    view.setPage(page)
+
+    # pdf-viewer.html loads PDF.js and pdf-lib from CDNs
+    settings = page.settings()
+    settings.setAttribute(
+        QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True
+    )
+
+    # --- QWebChannel in UserWorld ----------------------------------------
+    channel = QWebChannel()
+    server = PdfByteServer().start()
+    backend = Backend(server, initial_pdf=initial_pdf, initial_overlays=initial_overlays)
+    channel.registerObject("backend", backend)
+    page.setWebChannel(channel, QWebEngineScript.ScriptWorldId.UserWorld)
+
+    # --- Script injection into UserWorld ---------------------------------
+    # 1. qwebchannel.js at DocumentCreation (must be available first)
+    qwc_script = QWebEngineScript()
+    qwc_script.setName("qwebchannel")
+    qwc_script.setWorldId(QWebEngineScript.ScriptWorldId.UserWorld)
+    qwc_script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+    qwc_script.setSourceCode(read_qwebchannel_js())
+    page.scripts().insert(qwc_script)
+
+    # 2. Bridge JS at DocumentReady (DOM must exist)
+    ext_script = QWebEngineScript()
+    ext_script.setName("extension")
+    ext_script.setWorldId(QWebEngineScript.ScriptWorldId.UserWorld)
+    ext_script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
+    ext_script.setSourceCode(BRIDGE_JS.read_text(encoding="utf-8"))
+    page.scripts().insert(ext_script)
+
+    # --- Load the viewer -------------------------------------------------
+    print(f"Loading {VIEWER_HTML.name}", flush=True)
+    view.load(QUrl.fromLocalFile(str(VIEWER_HTML)))
+    view.resize(1200, 900)
+    view.show()
+
+    # --- Stdin reader thread ---------------------------------------------
+    reader = threading.Thread(
+        target=stdin_loop, args=(backend, app), daemon=True
+    )
+    reader.start()
+
+    status = app.exec()
+    server.close()
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,32 @@
 """Usage:
-plist_converter.py <xml_filename> <csv_filename>
+plist_converter.py [--stream] <xml_filename> <csv_filename>
+plist_converter.py --state=<state_file> <xml_filename> <csv_filename>
+
+Options:
+  --stream              Parse the XML incrementally and write rows as each
+                        playlist is read.  Memory is bounded by an index of
+                        the exported track fields instead of the whole library.
+  --state=<state_file>  Incremental export: write only the playlist/track rows
+                        inserted, updated or deleted since the export that
+                        wrote <state_file>, with an Operation column.  The
+                        first run against a new state file inserts everything.
 """
 
 # from https://www.google.com/search?q=xml+schema+for+itunes+playlists&sca_esv=4dee6c104a808b1e&rlz=1C1GCEA_enUS1165US1167&udm=50&fbs=AIIjpHxU7SXXniUZfeShr2fp4giZ1Y6MJ25_tmWITc7uy4KIeoJTKjrFjVxydQWqI2NcOha3O1YqG67F0QIhAOFN_ob1yXos5K_Qo9Tq-0cVPzex8akBC0YDCZ6Kdb3tXvKc6RFFaJZ5G23Reu3aSyxvn2qD41n-47oj-b-f0NcRPP5lz0IcnVzj2DIj_DMpoDz5XbfZAMcEl5-58jjbkgCC_7e4L5AEDQ&aep=1&ntc=1&sa=X&ved=2ahUKEwjm-IK_sraPAxWpGlkFHa9eDDUQ2J8OegQIEhAD&biw=1427&bih=759&dpr=2&mstk=AUtExfBfc1_mifSQYLnBiOj-2STo7vBLjnXfQUMfGiGRbvXfxl5HcJJK1B3Lg8T5vhEfYhQCOELwPAX4cq7dJINipbVdzrbK0VDUXmxTwUJgKPAWFlOZ-OtFamMTT4Vqgi2kjv3lR6mUmr7N8AFslSp2pGidhmL1beilQHvQHhl5yRl5j7PcpPLBnoODtdr-r0N18nPHkLZkQXc1-6u7vp8ElGVysK6yB1jRYUUoVnFJr6dKc2iQlUc9Oar3og&csuir=1
 
 import plistlib
 import csv
+import hashlib
+import json
+import os
 import sys
+import tempfile
+import xml.etree.ElementTree as ET
 import docopt
 
+# Track fields exported alongside the playlist name and track ID
+TRACK_FIELDS = ["Artist", "Album", "Name", "Genre", "Location"]
+
 
 def convert_itunes_xml_to_csv(xml_path, csv_path):
     """
@@ -75,10 +93,317 @@ def convert_itunes_xml_to_csv(xml_path, csv_path):
         print(f"Error writing to CSV file '{csv_path}': {e}")
 
 
+def _plist_scalar(elem):
+    """Value of a plist scalar element (None for dict/array)."""
+    tag = elem.tag
+    if tag in ("string", "date", "data"):
+        return elem.text or ""
+    if tag == "integer":
+        return int(elem.text)
+    if tag == "real":
+        return float(elem.text)
+    if tag == "true":
+        return True
+    if tag == "false":
+        return False
+    return None
+
+
+def iter_library(xml_path, track_fields):
+    """
+    Event-based walk over an iTunes library plist, yielding:
+
+      ("track", track_id, {field: value})   one per track, only `track_fields`
+      ("item", playlist, track_id)          one per playlist entry
+      ("playlist_end", playlist)            after each playlist's items
+      ("tracks_end",)                       once the Tracks dict is complete
+
+    `playlist` holds the playlist's scalar keys (Name, Playlist Persistent
+    ID, ...).  Every element is removed from the tree as soon as it has been
+    read, so memory does not grow with the document.
+
+    Layout by depth: <plist> 1, top-level <dict> 2, the Tracks dict and
+    Playlists array 3, a track or playlist <dict> 4, its values 5, playlist
+    item <dict>s 6 and their values 7.
+    """
+    wanted = set(track_fields)
+    stack = []
+    last_key = {}  # depth of a <dict> -> text of its most recent <key>
+    section = None
+    track = playlist = pending = item_id = None
+
+    for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            depth = len(stack)
+            if depth == 3:
+                # A top-level <key> starts the next entry; only its value
+                # belongs to the section that key names
+                section = None if elem.tag == "key" else last_key.get(2)
+            elif depth == 4 and section == "Tracks":
+                track = {}
+            elif depth == 4 and section == "Playlists":
+                playlist, pending = {}, []
+            continue
+
+        depth = len(stack)
+        tag = elem.tag
+        if tag == "key":
+            last_key[depth - 1] = elem.text
+        elif section == "Tracks":
+            if depth == 5 and last_key.get(4) in wanted:
+                track[last_key[4]] = _plist_scalar(elem)
+            elif depth == 4:
+                yield "track", last_key.get(3), track
+        elif section == "Playlists":
+            if depth == 5:
+                value = _plist_scalar(elem)
+                if value is not None:
+                    playlist[last_key.get(4)] = value
+            elif depth == 7 and last_key.get(6) == "Track ID":
+                item_id = str(_plist_scalar(elem))
+            elif depth == 6 and item_id is not None:
+                # iTunes writes Name before Playlist Items; buffer if not
+                if "Name" in playlist:
+                    yield "item", playlist, item_id
+                else:
+                    pending.append(item_id)
+                item_id = None
+            elif depth == 4:
+                for track_id in pending:
+                    yield "item", playlist, track_id
+                yield "playlist_end", playlist
+        if depth == 3:
+            if section == "Tracks":
+                yield ("tracks_end",)
+            section = None
+
+        stack.pop()
+        if depth >= 3:
+            stack[-1].remove(elem)
+
+
+def stream_itunes_xml_to_csv(xml_path, csv_path):
+    """
+    Streaming version of convert_itunes_xml_to_csv: same CSV, written row by
+    row while the XML is parsed.  iTunes writes Tracks before Playlists, so
+    the track index is complete when playlist items arrive; if a library
+    has them the other way round (plistlib sorts keys), items are spilled to
+    a temporary file and joined once Tracks has been read.
+    """
+    tracks = {}
+    tracks_done = False
+    spill = None
+    count = 0
+
+    def write_row(playlist_name, track_id):
+        nonlocal count
+        track_data = tracks.get(track_id)
+        if track_data is not None:
+            writer.writerow([playlist_name, track_id, *track_data])
+            count += 1
+
+    # Check before the CSV is opened (and truncated), so that a missing
+    # output directory is not reported as a missing XML file
+    if not os.path.isfile(xml_path):
+        print(
+            f"Error: The file '{xml_path}' was not found. Please ensure your XML file is in the correct directory."
+        )
+        return
+
+    try:
+        with open(csv_path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Playlist", "Track ID", *TRACK_FIELDS])
+            for kind, *data in iter_library(xml_path, TRACK_FIELDS):
+                if kind == "track":
+                    track_id, fields = data
+                    tracks[track_id] = tuple(fields.get(f) for f in TRACK_FIELDS)
+                elif kind == "item":
+                    playlist, track_id = data
+                    playlist_name = playlist.get("Name")
+                    if not playlist_name:
+                        continue
+                    if tracks_done:
+                        write_row(playlist_name, track_id)
+                    else:
+                        if spill is None:
+                            spill = tempfile.TemporaryFile("w+", newline="", encoding="utf-8")
+                        csv.writer(spill).writerow([playlist_name, track_id])
+                elif kind == "tracks_end":
+                    tracks_done = True
+                    if spill is not None:
+                        spill.seek(0)
+                        for playlist_name, track_id in csv.reader(spill):
+                            write_row(playlist_name, track_id)
+                        spill.close()
+                        spill = None
+    except ET.ParseError as e:
+        print(f"Error: The file '{xml_path}' is not a valid plist XML: {e}")
+        return
+    except IOError as e:
+        print(f"Error writing to CSV file '{csv_path}': {e}")
+        return
+    print(f"Successfully exported {count} tracks to '{csv_path}'.")
+
+
+def _load_state(state_path):
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"tracks": {}, "playlists": {}}
+
+
+def _save_state(state_path, state):
+    tmp = f"{state_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, state_path)
+
+
+def export_itunes_delta(xml_path, csv_path, state_path):
+    """
+    Incremental export.  Rows are (playlist, track) pairs keyed by Playlist
+    Persistent ID and track Persistent ID, which survive library rebuilds
+    unlike Track ID.  The state file records each track's Date Modified and,
+    per playlist, its name, a hash of its member list and the members:
+
+      insert  the pair is new
+      update  the track's Date Modified changed, or the playlist was renamed
+      delete  the pair is gone (track removed from the playlist or library,
+              or the playlist deleted); only the key columns are filled in
+
+    Playlists whose member hash and name are unchanged are only checked for
+    modified tracks.  The state file is replaced after the CSV is written,
+    so a failed export is simply repeated next time.
+    """
+    if not os.path.isfile(xml_path):
+        print(
+            f"Error: The file '{xml_path}' was not found. Please ensure your XML file is in the correct directory."
+        )
+        return
+    try:
+        old = _load_state(state_path)
+    except (IOError, ValueError) as e:
+        print(f"Error reading state file '{state_path}': {e}")
+        return
+    old_tracks, old_playlists = old["tracks"], old["playlists"]
+    new_tracks, new_playlists = {}, {}
+    tracks = {}  # Track ID -> (Persistent ID, exported fields)
+    changed = set()  # Persistent IDs modified since the last export
+    counts = {"insert": 0, "update": 0, "delete": 0}
+    index_fields = TRACK_FIELDS + ["Persistent ID", "Date Modified"]
+
+    def emit(op, playlist_name, playlist_pid, track_pid, track_id=None, fields=()):
+        writer.writerow([op, playlist_name, playlist_pid, track_id, track_pid, *fields])
+        counts[op] += 1
+
+    def diff_playlist(playlist, track_ids):
+        playlist_name = playlist.get("Name")
+        if not playlist_name:
+            return
+        playlist_pid = playlist.get("Playlist Persistent ID", playlist_name)
+        members = {}
+        for track_id in track_ids:
+            if track_id in tracks:
+                members.setdefault(tracks[track_id][0], track_id)
+        digest = hashlib.sha1("\n".join(members).encode("utf-8")).hexdigest()
+        new_playlists[playlist_pid] = {
+            "name": playlist_name, "hash": digest, "members": list(members)
+        }
+
+        previous = old_playlists.get(playlist_pid)
+        renamed = previous is not None and previous["name"] != playlist_name
+        if previous is not None and previous["hash"] == digest and not renamed:
+            for track_pid in (pid for pid in members if pid in changed):
+                track_id = members[track_pid]
+                emit("update", playlist_name, playlist_pid, track_pid, track_id, tracks[track_id][1])
+            return
+
+        before_list = previous["members"] if previous else []
+        before = set(before_list)
+        for track_pid, track_id in members.items():
+            if track_pid not in before:
+                emit("insert", playlist_name, playlist_pid, track_pid, track_id, tracks[track_id][1])
+            elif renamed or track_pid in changed:
+                emit("update", playlist_name, playlist_pid, track_pid, track_id, tracks[track_id][1])
+        for track_pid in before_list:
+            if track_pid not in members:
+                emit("delete", playlist_name, playlist_pid, track_pid)
+
+    tracks_done = False
+    spill = None
+    current_items = []
+    try:
+        with open(csv_path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(
+                ["Operation", "Playlist", "Playlist Persistent ID", "Track ID",
+                 "Persistent ID", *TRACK_FIELDS]
+            )
+            for kind, *data in iter_library(xml_path, index_fields):
+                if kind == "track":
+                    track_id, fields = data
+                    track_pid = fields.get("Persistent ID", track_id)
+                    modified = fields.get("Date Modified")
+                    tracks[track_id] = (track_pid, tuple(fields.get(f) for f in TRACK_FIELDS))
+                    new_tracks[track_pid] = modified
+                    if track_pid in old_tracks and old_tracks[track_pid] != modified:
+                        changed.add(track_pid)
+                elif kind == "item":
+                    current_items.append(data[1])
+                elif kind == "playlist_end":
+                    playlist = data[0]
+                    if tracks_done:
+                        diff_playlist(playlist, current_items)
+                    else:
+                        # Playlists before Tracks: hold them on disk until
+                        # the track index (and `changed`) is complete
+                        if spill is None:
+                            spill = tempfile.TemporaryFile("w+", encoding="utf-8")
+                        spill.write(json.dumps([playlist, current_items]) + "\n")
+                    current_items = []
+                elif kind == "tracks_end":
+                    tracks_done = True
+                    if spill is not None:
+                        spill.seek(0)
+                        for line in spill:
+                            diff_playlist(*json.loads(line))
+                        spill.close()
+                        spill = None
+
+            for playlist_pid, previous in old_playlists.items():
+                if playlist_pid not in new_playlists:
+                    for track_pid in previous["members"]:
+                        emit("delete", previous["name"], playlist_pid, track_pid)
+    except ET.ParseError as e:
+        print(f"Error: The file '{xml_path}' is not a valid plist XML: {e}")
+        return
+    except IOError as e:
+        print(f"Error writing to CSV file '{csv_path}': {e}")
+        return
+
+    try:
+        _save_state(state_path, {"tracks": new_tracks, "playlists": new_playlists})
+    except IOError as e:
+        print(f"Error writing state file '{state_path}': {e}")
+        return
+    print(
+        f"Exported {counts['insert']} inserts, {counts['update']} updates and "
+        f"{counts['delete']} deletes to '{csv_path}'."
+    )
+
+
 if __name__ == "__main__":
     arguments = docopt.docopt(__doc__, version="Naval Fate 2.0")
     xml_filename = arguments["<xml_filename>"]
     csv_filename = arguments["<csv_filename>"]
     # xml_filename = "iTunes Music Library.xml"
     # csv_filename = "playlists.csv"
-    convert_itunes_xml_to_csv(xml_filename, csv_filename)
+    if arguments["--state"]:
+        export_itunes_delta(xml_filename, csv_filename, arguments["--state"])
+    elif arguments["--stream"]:
+        stream_itunes_xml_to_csv(xml_filename, csv_filename)
+    else:
+        convert_itunes_xml_to_csv(xml_filename, csv_filename)
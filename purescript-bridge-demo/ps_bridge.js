@@ -11,17 +11,130 @@
  *
  * The DOM is shared between UserWorld and MainWorld, so CustomEvents
  * cross the boundary naturally (same pattern as leaflet_bridge.js).
+ *
+ * Reaction rules
+ * --------------
+ * Python can install rules that the bridge evaluates locally, so feedback
+ * such as hover highlighting does not wait for a round trip through Python:
+ *
+ *   {"command": "install-rules", "rules": [
+ *       {"on": "node-hover", "emit": {"command": "highlight", "path": "{path}"}},
+ *       {"on": "item-clicked", "when": {"label": "Apple"},
+ *        "emit": {"command": "set-color", "color": "#ff6600"}}
+ *   ]}
+ *   {"command": "clear-rules"}
+ *
+ *   on      event type to react to
+ *   when    optional {field: value} that the event must match
+ *   emit    command (or array of commands) dispatched straight back to PS;
+ *           "{field}" is replaced by the event's field — a whole-string
+ *           placeholder keeps the field's JSON type
+ *   notify  false to keep matched events from Python altogether
+ *
+ * Events matched by a rule are still reported to Python, but batched and
+ * asynchronously (backend.onPsEventBatch); unmatched events go straight to
+ * backend.onPsEvent as before.  Rules are applied in install order, and
+ * install-rules replaces the whole set.
+ *
+ * State sync commands (state-patch, state-resync) are dispatched as
+ * __qt_state__ instead, for Bridge.subscribeState.
  */
 (function () {
     "use strict";
 
+    var BATCH_MS = 50;
+    var PLACEHOLDER_RE = /\{([\w-]+)\}/g;
+    var WHOLE_PLACEHOLDER_RE = /^\{([\w-]+)\}$/;
+
+    // event type → [rule, ...]
+    var rules = {};
+
+    function installRules(list) {
+        rules = {};
+        (list || []).forEach(function (rule) {
+            if (!rule || typeof rule.on !== "string") return;
+            (rules[rule.on] = rules[rule.on] || []).push(rule);
+        });
+    }
+
+    function matches(rule, evt) {
+        if (!rule.when) return true;
+        for (var key in rule.when) {
+            if (evt[key] !== rule.when[key]) return false;
+        }
+        return true;
+    }
+
+    function fill(template, evt) {
+        if (typeof template === "string") {
+            var whole = WHOLE_PLACEHOLDER_RE.exec(template);
+            if (whole) return evt[whole[1]];
+            return template.replace(PLACEHOLDER_RE, function (_, key) {
+                return evt[key] === undefined ? "" : String(evt[key]);
+            });
+        }
+        if (Array.isArray(template)) {
+            return template.map(function (t) { return fill(t, evt); });
+        }
+        if (template !== null && typeof template === "object") {
+            var out = {};
+            for (var key in template) out[key] = fill(template[key], evt);
+            return out;
+        }
+        return template;
+    }
+
+    function dispatchCommand(detail) {
+        document.dispatchEvent(
+            new CustomEvent("__qt_command__", { detail: detail })
+        );
+    }
+
+    /**
+     * Run the rules for one event.  Returns null if none matched, otherwise
+     * whether Python should still be told about the event.
+     */
+    function applyRules(evt) {
+        var candidates = rules[evt && evt.type];
+        if (!candidates) return null;
+        var matched = false;
+        var notify = false;
+        for (var i = 0; i < candidates.length; i++) {
+            var rule = candidates[i];
+            if (!matches(rule, evt)) continue;
+            matched = true;
+            notify = notify || rule.notify !== false;
+            var emitted = [].concat(rule.emit || []);
+            for (var j = 0; j < emitted.length; j++) {
+                dispatchCommand(fill(emitted[j], evt));
+            }
+        }
+        return matched ? notify : null;
+    }
+
     new QWebChannel(qt.webChannelTransport, function (channel) {
         var backend = channel.objects.backend;
         backend.log("PureScript bridge connected in UserWorld");
 
+        var pending = [];
+        var flushTimer = null;
+
+        function flush() {
+            flushTimer = null;
+            var batch = pending;
+            pending = [];
+            backend.onPsEventBatch(JSON.stringify(batch));
+        }
+
         // PS → Python: forward CustomEvents to Python via QWebChannel slot
         document.addEventListener("__ps_event__", function (e) {
-            backend.onPsEvent(JSON.stringify(e.detail));
+            var notify = applyRules(e.detail);
+            if (notify === null) {
+                backend.onPsEvent(JSON.stringify(e.detail));
+            } else if (notify) {
+                pending.push(e.detail);
+                if (flushTimer === null) flushTimer = setTimeout(flush, BATCH_MS);
+            }
         });
 
         // Python → PS: forward signal to CustomEvent on shared DOM
@@ -33,9 +146,25 @@
                 backend.log("Failed to parse command JSON: " + err);
                 return;
             }
-            document.dispatchEvent(
-                new CustomEvent("__qt_command__", { detail: detail })
-            );
+            // Rule management is handled here and never reaches PS
+            if (detail && detail.command === "install-rules") {
+                installRules(detail.rules);
+                backend.log("Installed " + (detail.rules || []).length + " reaction rule(s)");
+                return;
+            }
+            if (detail && detail.command === "clear-rules") {
+                installRules([]);
+                backend.log("Cleared reaction rules");
+                return;
+            }
+            // State sync commands go to Bridge.subscribeState, not the command handlers
+            if (detail && (detail.command === "state-patch" || detail.command === "state-resync")) {
+                document.dispatchEvent(
+                    new CustomEvent("__qt_state__", { detail: detail })
+                );
+                return;
+            }
+            dispatchCommand(detail);
         });
 
         backend.log("PureScript bridge ready");
@@ -5,45 +5,363 @@ Adapted from map_bridge.py — same architecture (ConsolePage, Backend,
 QWebChannel in UserWorld, script injection) but application-agnostic.
 
 Usage:
-    python ps_bridge.py <html_file> <bridge_js_file> [--auto-respond]
+    python ps_bridge.py <html_file> <bridge_js_file> [--auto-respond] [--tree DIR] [--watch]
 
 Example:
     uv run python purescript-bridge-demo/ps_bridge.py \
         purescript-bridge-demo/public/stage1.html \
         purescript-bridge-demo/ps_bridge.js
 
+With --tree, Stage 4 shows DIR as a lazily loaded hierarchy: the root and
+its entries are sent with set-tree, and each node-expand event from the page
+is answered with add-children for that directory only:
+    uv run python purescript-bridge-demo/ps_bridge.py \
+        purescript-bridge-demo/public/stage4.html \
+        purescript-bridge-demo/ps_bridge.js --tree .
+
+With --auto-respond, Python installs reaction rules into ps_bridge.js
+(see AUTO_RESPOND_RULES), so responses such as hover highlighting are
+produced in the page without waiting for Python; Python still receives
+the events, batched.
+
+With --watch, edits under src/ rebuild the shown stage's bundle (spago
+bundle) and swap it into the running page, keeping component state; Stage 1
+is reloaded instead.
+
 Once running, type JSON command strings at the prompt:
     {"command": "set-status", "text": "Hello from Python!"}
 
+Stages 2-4 also publish their state, which backend.state (StateMirror) keeps
+in step from JSON patches; state-get / state-set at the prompt use it.
+
 Ctrl+D (EOF) quits cleanly.
 """
 
 import argparse
+import copy
 import json
 import os
+import re
 import sys
 import threading
-from datetime import datetime
+import time
 from pathlib import Path
 
-from PySide6.QtCore import QFile, QIODeviceBase, QObject, QUrl, Signal, Slot
+from PySide6.QtCore import (
+    QFile, QFileSystemWatcher, QIODeviceBase, QObject, QProcess, QTimer, QUrl, Signal, Slot,
+)
 from PySide6.QtWidgets import QApplication
 from PySide6.QtWebChannel import QWebChannel
 from PySide6.QtWebEngineCore import QWebEnginePage, QWebEngineScript, QWebEngineSettings
 from PySide6.QtWebEngineWidgets import QWebEngineView
 
+# The shared event log lives with the other Python-side helpers
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python_js_purescript_integration"))
+import event_log  # noqa: E402
+from event_log import ConsolePage  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# DirectoryTree — hierarchy provider for Stage 4, one directory per request
+# ---------------------------------------------------------------------------
+class DirectoryTree:
+    """Serve a directory as Stage 4 tree nodes, listing only what is asked for.
+
+    Node paths are the root's name followed by slash-separated entry names,
+    e.g. "project/src/main.py".  Directories report hasChildren without being
+    listed; the page asks for their entries with node-expand when opened.
+    """
+
+    def __init__(self, root, max_children=200):
+        self.root = Path(root).expanduser().resolve()
+        self.label = self.root.name or str(self.root)
+        self.max_children = max_children
+
+    def _resolve(self, node_path):
+        head, _, rest = node_path.partition("/")
+        parts = [p for p in rest.split("/") if p]
+        if head != self.label or any(p in (".", "..") for p in parts):
+            raise ValueError(f"Not a node of {self.root}: {node_path!r}")
+        return self.root.joinpath(*parts)
+
+    def root_node(self):
+        """The root with its first level of entries already loaded."""
+        return {
+            "name": self.label,
+            "path": self.label,
+            "hasChildren": True,
+            "children": self.children(self.label),
+        }
+
+    def children(self, node_path):
+        """Entries of one directory, directories first, capped at max_children."""
+        try:
+            with os.scandir(self._resolve(node_path)) as it:
+                entries = sorted(
+                    it, key=lambda e: (not e.is_dir(follow_symlinks=False), e.name.lower())
+                )
+        except (OSError, ValueError) as e:
+            event_log.get_log().warning("tree", "%s", e)
+            return []
+        nodes = [
+            {
+                "name": e.name,
+                "path": f"{node_path}/{e.name}",
+                "hasChildren": e.is_dir(follow_symlinks=False),
+            }
+            for e in entries[: self.max_children]
+        ]
+        hidden = len(entries) - len(nodes)
+        if hidden > 0:
+            nodes.append({
+                "name": f"… {hidden} more",
+                "path": f"{node_path}/…",
+                "hasChildren": False,
+            })
+        return nodes
+
+
+# ---------------------------------------------------------------------------
+# JSON patch (RFC 6902) — the same diff/apply as src/Bridge.js
+# ---------------------------------------------------------------------------
+def _escape_pointer(key):
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _parse_pointer(pointer):
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"Bad JSON pointer: {pointer!r}")
+    return [p.replace("~1", "/").replace("~0", "~") for p in pointer[1:].split("/")]
+
+
+def _diff(a, b, path, ops):
+    if a == b and type(a) is type(b):
+        return
+    if isinstance(a, list) and isinstance(b, list):
+        # Trim the common prefix and suffix so an insert or removal in the
+        # middle of a long list costs one op
+        start = 0
+        while start < len(a) and start < len(b) and a[start] == b[start]:
+            start += 1
+        end_a, end_b = len(a), len(b)
+        while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+            end_a -= 1
+            end_b -= 1
+        common = min(end_a, end_b) - start
+        for i in range(start, start + common):
+            _diff(a[i], b[i], f"{path}/{i}", ops)
+        for _ in range(start + common, end_a):
+            ops.append({"op": "remove", "path": f"{path}/{start + common}"})
+        for i in range(start + common, end_b):
+            ops.append({"op": "add", "path": f"{path}/{i}", "value": copy.deepcopy(b[i])})
+    elif isinstance(a, dict) and isinstance(b, dict):
+        for k in a:
+            if k not in b:
+                ops.append({"op": "remove", "path": f"{path}/{_escape_pointer(k)}"})
+        for k, v in b.items():
+            p = f"{path}/{_escape_pointer(k)}"
+            if k in a:
+                _diff(a[k], v, p, ops)
+            else:
+                ops.append({"op": "add", "path": p, "value": copy.deepcopy(v)})
+    else:
+        ops.append({"op": "replace", "path": path, "value": copy.deepcopy(b)})
+
+
+def make_patch(old, new):
+    """JSON patch that turns ``old`` into ``new``."""
+    ops = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _get(doc, parts):
+    for part in parts:
+        if isinstance(doc, list):
+            doc = doc[int(part)]
+        else:
+            doc = doc[part]
+    return doc
+
+
+def _apply_op(doc, op):
+    kind = op["op"]
+    parts = _parse_pointer(op["path"])
+    if kind == "test":
+        if _get(doc, parts) != op["value"]:
+            raise ValueError(f"Test failed at {op['path']}")
+        return doc
+    if kind in ("move", "copy"):
+        value = copy.deepcopy(_get(doc, _parse_pointer(op["from"])))
+        if kind == "move":
+            doc = _apply_op(doc, {"op": "remove", "path": op["from"]})
+        return _apply_op(doc, {"op": "add", "path": op["path"], "value": value})
+    if not parts:
+        if kind == "remove":
+            raise ValueError("Cannot remove the document root")
+        return copy.deepcopy(op["value"])
+    parent, key = _get(doc, parts[:-1]), parts[-1]
+    if isinstance(parent, list):
+        index = len(parent) if key == "-" else int(key)
+        if not 0 <= index <= len(parent) - (kind != "add"):
+            raise IndexError(f"Bad array index at {op['path']}")
+        if kind == "add":
+            parent.insert(index, copy.deepcopy(op["value"]))
+        elif kind == "remove":
+            del parent[index]
+        elif kind == "replace":
+            parent[index] = copy.deepcopy(op["value"])
+        else:
+            raise ValueError(f"Unknown op: {kind}")
+    elif isinstance(parent, dict):
+        if kind == "add":
+            parent[key] = copy.deepcopy(op["value"])
+        elif kind in ("remove", "replace"):
+            if key not in parent:
+                raise KeyError(f"Path not found: {op['path']}")
+            if kind == "remove":
+                del parent[key]
+            else:
+                parent[key] = copy.deepcopy(op["value"])
+        else:
+            raise ValueError(f"Unknown op: {kind}")
+    else:
+        raise ValueError(f"Not a container: {op['path']}")
+    return doc
+
+
+def apply_patch(doc, patch):
+    """Apply a JSON patch to a copy of ``doc``; raises if an operation fails."""
+    doc = copy.deepcopy(doc)
+    for op in patch:
+        doc = _apply_op(doc, op)
+    return doc
+
 
 # ---------------------------------------------------------------------------
-# ConsolePage — JS console.log/warn/error → Python stdout
+# StateMirror — Python copy of each component's state document
 # ---------------------------------------------------------------------------
-class ConsolePage(QWebEnginePage):
-    def javaScriptConsoleMessage(self, level, message, line, source):
-        level_str = {
-            QWebEnginePage.JavaScriptConsoleMessageLevel.InfoMessageLevel: "INFO",
-            QWebEnginePage.JavaScriptConsoleMessageLevel.WarningMessageLevel: "WARN",
-            QWebEnginePage.JavaScriptConsoleMessageLevel.ErrorMessageLevel: "ERROR",
-        }.get(level, "DEBUG")
-        print(f"  [JS {level_str}] {source}:{line}: {message}", flush=True)
+class StateMirror:
+    """Versioned copies of the state documents components publish.
+
+    The page sends a snapshot first and JSON patches after that, each
+    naming the version it applies to; a patch that does not fit triggers a
+    resync (full snapshot).  Reading state never touches the page.
+
+    Python's own changes are applied here straight away and sent as one
+    patch against the current version.  If the page changed in the
+    meantime it rejects the patch and answers with a snapshot, which then
+    wins.
+    """
+
+    def __init__(self, send):
+        self._send = send  # callable(dict) — emits a command to the page
+        self._lock = threading.Lock()
+        self.docs = {}
+        self.versions = {}
+        self._reloading = set()
+
+    def on_event(self, evt):
+        """Consume state-snapshot / state-patch events; True if handled."""
+        etype = evt.get("type")
+        component = evt.get("component")
+        if etype == "state-snapshot":
+            with self._lock:
+                restore = None
+                if evt.get("initial") and component in self._reloading:
+                    self._reloading.discard(component)
+                    restore = self.docs.get(component)
+                self.docs[component] = evt["state"]
+                self.versions[component] = evt["version"]
+            event_log.get_log().info("state", "%s v%s: snapshot", component, evt["version"])
+            if restore is not None:
+                self.patch(component, make_patch(evt["state"], restore))
+            return True
+        if etype != "state-patch":
+            return False
+        with self._lock:
+            if self.versions.get(component) != evt["base"]:
+                stale = True
+            else:
+                stale = False
+                try:
+                    self.docs[component] = apply_patch(self.docs[component], evt["patch"])
+                    self.versions[component] = evt["version"]
+                except (KeyError, IndexError, ValueError, TypeError):
+                    stale = True
+        if stale:
+            event_log.get_log().warning(
+                "state", "%s out of step at v%s, resyncing", component, evt["base"]
+            )
+            self.resync(component)
+        else:
+            event_log.get_log().debug(
+                "state", "%s v%s: %d op(s)", component, evt["version"], len(evt["patch"])
+            )
+        return True
+
+    def get(self, component, pointer=""):
+        """Value at a JSON pointer in the mirrored document (a copy)."""
+        with self._lock:
+            return copy.deepcopy(_get(self.docs[component], _parse_pointer(pointer)))
+
+    def patch(self, component, ops):
+        """Apply JSON patch operations locally and send them to the page."""
+        if not ops:
+            return
+        with self._lock:
+            if component not in self.docs:
+                raise KeyError(f"No state received for {component!r} yet")
+            self.docs[component] = apply_patch(self.docs[component], ops)
+            base = self.versions[component]
+            self.versions[component] = base + 1
+        self._send({"command": "state-patch", "component": component, "base": base, "patch": ops})
+
+    def update(self, component, fn):
+        """Edit a copy of the document with ``fn`` (in place, or by returning
+        a new one) and send the difference as a single patch."""
+        old = self.get(component)
+        draft = copy.deepcopy(old)
+        new = fn(draft)
+        self.patch(component, make_patch(old, draft if new is None else new))
+
+    def set(self, component, pointer, value):
+        self.patch(component, [{"op": "add", "path": pointer, "value": value}])
+
+    def expect_reload(self):
+        """The page is about to be replaced: when each component comes back
+        with a fresh snapshot, patch it back to the state mirrored now."""
+        with self._lock:
+            self._reloading = set(self.docs)
+
+    def reload_done(self):
+        """Stop restoring: components that have not come back by now were
+        dropped from the new bundle, and their old state must not be patched
+        over them if they reappear later."""
+        with self._lock:
+            self._reloading.clear()
+
+    def resync(self, component):
+        self._send({"command": "state-resync", "component": component})
+
+
+# ---------------------------------------------------------------------------
+# Reaction rules — evaluated by ps_bridge.js, see install-rules there
+# ---------------------------------------------------------------------------
+AUTO_RESPOND_RULES = [
+    {"on": "click",
+     "emit": {"command": "set-status", "text": "Python saw click on {color}"}},
+    {"on": "counter",
+     "emit": {"command": "set-status", "text": "Python saw counter = {value}"}},
+    {"on": "item-clicked",
+     "emit": {"command": "set-color", "color": "#ff6600"}},
+    {"on": "node-hover",
+     "emit": {"command": "highlight", "path": "{path}"}},
+    {"on": "node-click",
+     "emit": {"command": "set-status", "text": "Python saw node click: {name}"}},
+]
 
 
 # ---------------------------------------------------------------------------
@@ -53,36 +371,84 @@ class Backend(QObject):
     # Signal for Python → JS communication via QWebChannel
     commandRequested = Signal(str)
 
-    def __init__(self, auto_respond=False, parent=None):
+    def __init__(self, auto_respond=False, tree=None, parent=None):
         super().__init__(parent)
         self.ready = False
         self.auto_respond = auto_respond
+        self.tree = tree
+        self.state = StateMirror(lambda cmd: self.commandRequested.emit(json.dumps(cmd)))
 
     @Slot(str)
     def log(self, message):
-        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        print(f"  [bridge {ts}] {message}", flush=True)
-        if "ready" in message.lower():
+        event_log.get_log().info("bridge", message)
+        if "ready" in message.lower() and not self.ready:
             self.ready = True
+            if self.auto_respond:
+                self.install_rules(AUTO_RESPOND_RULES)
+            # The component may have asked (tree-request) before the bridge
+            # was listening, so push the tree once the bridge is up as well
+            self.send_tree()
+
+    def install_rules(self, rules):
+        """Replace the bridge's reaction rules (an empty list clears them)."""
+        self.commandRequested.emit(json.dumps({
+            "command": "install-rules",
+            "rules": rules,
+        }))
+
+    def send_tree(self):
+        if self.tree is not None:
+            self.commandRequested.emit(json.dumps({
+                "command": "set-tree",
+                "root": self.tree.root_node(),
+            }))
 
     @Slot(str)
     def onPsEvent(self, event_json):
-        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
         try:
             evt = json.loads(event_json)
         except json.JSONDecodeError:
-            print(f"  [PS {ts}] {event_json}", flush=True)
+            event_log.get_log().warning("PS", "%s", event_json)
+            return
+
+        if self.state.on_event(evt):
             return
 
-        etype = evt.get("type", "?")
-        print(f"  [PS {ts}] {etype}: {json.dumps(evt)}", flush=True)
+        event_log.get_log().info("PS", "%s: %s", evt.get("type", "?"), event_log.Json(evt))
+        self._handle_event(evt)
 
         # Auto-respond mode: echo back matching commands
         if self.auto_respond:
             self._auto_respond(evt)
 
+    @Slot(str)
+    def onPsEventBatch(self, batch_json):
+        """Events a reaction rule already answered in the page, batched."""
+        log = event_log.get_log()
+        for evt in json.loads(batch_json):
+            log.debug("PS rule", "%s: %s", evt.get("type", "?"), event_log.Json(evt))
+            self._handle_event(evt)
+
+    def _handle_event(self, evt):
+        etype = evt.get("type", "")
+        if self.tree is not None:
+            if etype == "tree-request":
+                self.send_tree()
+            elif etype == "node-expand":
+                path = evt.get("path", "")
+                self.commandRequested.emit(json.dumps({
+                    "command": "add-children",
+                    "path": path,
+                    "children": self.tree.children(path),
+                }))
+
     def _auto_respond(self, evt):
-        """Generate automatic responses for testing."""
+        """Generate automatic responses for testing.
+
+        Normally the installed AUTO_RESPOND_RULES answer these in the page
+        and the events arrive via onPsEventBatch instead; this covers events
+        sent before the rules were installed.
+        """
         etype = evt.get("type", "")
 
         if etype == "click":
@@ -104,7 +470,7 @@ class Backend(QObject):
                 "color": "#ff6600",
             }))
         elif etype == "pong":
-            print("  [PS] Pong received!", flush=True)
+            event_log.get_log().info("PS", "Pong received!")
         elif etype == "node-hover":
             path = evt.get("path", "")
             self.commandRequested.emit(json.dumps({
@@ -118,6 +484,145 @@ class Backend(QObject):
             }))
 
 
+# ---------------------------------------------------------------------------
+# HotReloader — rebuild on src/ changes, swap the bundle into the live page
+# ---------------------------------------------------------------------------
+# Runs in MainWorld.  Tears the running app down via Bridge.js's __psHot and
+# says whether the new bundle can be injected or the page must reload.
+HOT_DISPOSE_JS = """
+(function () {
+    var hot = window.__psHot;
+    if (!hot || !hot.canSwap()) return "reload";
+    hot.dispose();
+    return "swap";
+})();
+"""
+
+
+class HotReloader(QObject):
+    """Watch a PureScript project's src/ and hot-swap the page's bundle.
+
+    Only the bundle of the stage being shown is rebuilt, and only when the
+    change can affect it (its own StageN/ directory or shared modules).
+    spago compiles incrementally, so a rebuild is just the changed modules
+    plus esbuild.  The new bundle is run in the existing page, so the view,
+    QWebChannel and UserWorld scripts stay up; component state is put back
+    from backend.state once the new components publish their snapshots.
+    """
+
+    DEBOUNCE_MS = 100
+    RESTORE_MS = 5000  # how long the new components have to send their first snapshot
+
+    def __init__(self, page, backend, page_path, parent=None):
+        super().__init__(parent)
+        self.page = page
+        self.backend = backend
+        match = re.fullmatch(r"stage(\d+)\.html", page_path.name)
+        if match is None:
+            raise ValueError(f"--watch needs a stageN.html page, got {page_path.name}")
+        self.stage_dir = f"Stage{match.group(1)}"
+        self.module = f"{self.stage_dir}.Main"
+        self.bundle = page_path.with_name(f"stage{match.group(1)}-bundle.js")
+        self.project = next(
+            (d for d in page_path.parents if (d / "spago.yaml").exists()), None
+        )
+        if self.project is None:
+            raise ValueError(f"No spago.yaml above {page_path}")
+        self.src = self.project / "src"
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._changed)
+        self.watcher.directoryChanged.connect(self._changed)
+        self._watch_tree()
+
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(self.DEBOUNCE_MS)
+        self.debounce.timeout.connect(self._build)
+
+        self.process = None
+        self.dirty = False
+        self.started = 0.0
+
+    def _watch_tree(self):
+        # Editors often save by replacing the file, which drops the watch,
+        # so every change re-adds whatever is there now
+        paths = [str(self.src)]
+        for root, dirs, files in os.walk(self.src):
+            paths += [os.path.join(root, d) for d in dirs]
+            paths += [os.path.join(root, f) for f in files]
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        new = [p for p in paths if p not in watched]
+        if new:
+            self.watcher.addPaths(new)
+
+    def _affects_page(self, path):
+        try:
+            parts = Path(path).relative_to(self.src).parts
+        except ValueError:
+            return False
+        if parts and re.fullmatch(r"Stage\d+", parts[0]):
+            return parts[0] == self.stage_dir
+        return True
+
+    def _changed(self, path):
+        self._watch_tree()
+        if self._affects_page(path):
+            self.debounce.start()
+
+    def _build(self):
+        if self.process is not None:
+            # Build again as soon as the running one finishes
+            self.dirty = True
+            return
+        self.dirty = False
+        self.started = time.perf_counter()
+        event_log.get_log().info("watch", "rebuilding %s ...", self.module)
+        self.process = QProcess(self)
+        self.process.setWorkingDirectory(str(self.project))
+        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        self.process.finished.connect(self._built)
+        self.process.start("spago", [
+            "bundle", "--module", self.module,
+            "--outfile", str(self.bundle), "--platform", "browser",
+        ])
+
+    def _built(self, exit_code, exit_status):
+        output = self.process.readAll().data().decode("utf-8", "replace")
+        self.process.deleteLater()
+        self.process = None
+        if self.dirty:
+            self._build()
+            return
+        if exit_status != QProcess.ExitStatus.NormalExit or exit_code != 0:
+            event_log.get_log().error("watch", "build failed:\n%s", output)
+            return
+        event_log.get_log().info("watch", "built in %.2fs", time.perf_counter() - self.started)
+        self.backend.state.expect_reload()
+        self.page.runJavaScript(
+            HOT_DISPOSE_JS, QWebEngineScript.ScriptWorldId.MainWorld, self._swap
+        )
+
+    def _swap(self, result):
+        if result == "swap":
+            source = self.bundle.read_text(encoding="utf-8")
+            self.page.runJavaScript(
+                source, QWebEngineScript.ScriptWorldId.MainWorld, self._swapped
+            )
+            event_log.get_log().info(
+                "watch", "swapped in %.2fs after change", time.perf_counter() - self.started
+            )
+        else:
+            # The reloaded bridge announces itself again and gets rules re-sent
+            self.backend.ready = False
+            self.page.triggerAction(QWebEnginePage.WebAction.ReloadAndBypassCache)
+            event_log.get_log().info("watch", "page cannot hot-swap, reloading")
+            self._swapped(None)
+
+    def _swapped(self, result):
+        QTimer.singleShot(self.RESTORE_MS, self.backend.state.reload_done)
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -131,6 +636,30 @@ def read_qwebchannel_js():
     return content
 
 
+def handle_state_command(mirror, cmd):
+    """Prompt commands that go through the state mirror instead of the page.
+
+    {"command": "state-get", "component": "stage3", "path": "/items"}
+    {"command": "state-set", "component": "stage3", "path": "/status", "value": "hi"}
+    {"command": "state-patch", "component": "stage3", "patch": [...]}   (no base)
+    """
+    command = cmd.get("command")
+    component = cmd.get("component")
+    try:
+        if command == "state-get":
+            value = mirror.get(component, cmd.get("path", ""))
+            print(f"  {json.dumps(value, indent=2)}", flush=True)
+        elif command == "state-set":
+            mirror.set(component, cmd["path"], cmd.get("value"))
+        elif command == "state-patch" and "base" not in cmd:
+            mirror.patch(component, cmd.get("patch", []))
+        else:
+            return False
+    except (KeyError, IndexError, ValueError, TypeError) as e:
+        print(f"  {command} failed: {e}", flush=True)
+    return True
+
+
 def stdin_loop(backend, app):
     """Background thread: read JSON command strings from stdin, emit via signal."""
     while True:
@@ -144,10 +673,12 @@ def stdin_loop(backend, app):
             continue
         # Validate JSON
         try:
-            json.loads(line)
+            cmd = json.loads(line)
         except json.JSONDecodeError as e:
             print(f"  Invalid JSON: {e}", flush=True)
             continue
+        if isinstance(cmd, dict) and handle_state_command(backend.state, cmd):
+            continue
         backend.commandRequested.emit(line)
         print(f"  Sent: {line}", flush=True)
 
@@ -163,8 +694,21 @@ def main():
     parser.add_argument("extension_js", help="Path to the JS bridge file to inject into UserWorld")
     parser.add_argument(
         "--auto-respond", action="store_true",
-        help="Automatically respond to PureScript events with matching commands"
+        help="Install reaction rules that answer PureScript events in the page"
     )
+    parser.add_argument(
+        "--tree", metavar="DIR", default=None,
+        help="Serve DIR to Stage 4 as a lazily loaded tree"
+    )
+    parser.add_argument(
+        "--max-children", type=int, default=200,
+        help="Entries sent per directory with --tree (default: 200)"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Rebuild the page's bundle when src/ changes and hot-swap it"
+    )
+    event_log.add_arguments(parser)
     args = parser.parse_args()
 
     # Resolve page URL
@@ -180,6 +724,14 @@ def main():
         sys.exit(1)
     extension_js = ext_js_path.read_text(encoding="utf-8")
 
+    tree = None
+    if args.tree is not None:
+        tree = DirectoryTree(args.tree, max_children=args.max_children)
+        if not tree.root.is_dir():
+            print(f"Tree root is not a directory: {tree.root}", file=sys.stderr)
+            sys.exit(1)
+
+    event_log.configure_from_args(args)
     app = QApplication(sys.argv)
 
     # --- Page & view -----------------------------------------------------
@@ -195,7 +747,7 @@ def main():
 
     # --- QWebChannel in UserWorld ----------------------------------------
     channel = QWebChannel()
-    backend = Backend(auto_respond=args.auto_respond)
+    backend = Backend(auto_respond=args.auto_respond, tree=tree)
     channel.registerObject("backend", backend)
     page.setWebChannel(channel, QWebEngineScript.ScriptWorldId.UserWorld)
 
@@ -216,6 +768,18 @@ def main():
     ext_script.setSourceCode(extension_js)
     page.scripts().insert(ext_script)
 
+    # --- Hot reload --------------------------------------------------------
+    if args.watch:
+        if not page_url.isLocalFile():
+            print("--watch needs a local stageN.html page", file=sys.stderr)
+            sys.exit(1)
+        try:
+            reloader = HotReloader(page, backend, Path(page_url.toLocalFile()).resolve())
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        print(f"Watching {reloader.src} for {reloader.module}", flush=True)
+
     # --- Load the page ---------------------------------------------------
     print(f"Loading {page_url.toString()}", flush=True)
     print(f"Extension: {ext_js_path.name}", flush=True)
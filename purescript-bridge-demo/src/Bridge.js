@@ -1,5 +1,45 @@
 // FFI for Bridge.purs — CustomEvent dispatch/listen
 
+// ---------------------------------------------------------------------------
+// Hot reload — ps_bridge.py --watch swaps in a rebuilt bundle without
+// reloading the page.  It calls window.__psHot.dispose() first, which
+// flushes pending state, unmounts the app and removes every document
+// listener this copy of the bridge added; the new bundle then installs
+// its own __psHot.  Apps that cannot be torn down (no onHotDispose, e.g.
+// Stage 1) report canSwap() false and get a full page reload instead.
+// ---------------------------------------------------------------------------
+
+var listeners = [];
+var disposers = [];
+
+function listen(type, handler) {
+  document.addEventListener(type, handler);
+  listeners.push([type, handler]);
+  return function () {
+    document.removeEventListener(type, handler);
+    listeners = listeners.filter(function (l) { return l[1] !== handler; });
+  };
+}
+
+window.__psHot = {
+  canSwap: function () { return disposers.length > 0; },
+  dispose: function () {
+    Object.keys(syncs).forEach(function (k) {
+      if (syncs[k].current !== undefined) flushState(syncs[k]);
+    });
+    disposers.splice(0).forEach(function (d) { d(); });
+    listeners.splice(0).forEach(function (l) {
+      document.removeEventListener(l[0], l[1]);
+    });
+  },
+};
+
+export const onHotDispose = function (effect) {
+  return function () {
+    disposers.push(effect);
+  };
+};
+
 export const dispatchPsEvent = function (json) {
   return function () {
     document.dispatchEvent(
@@ -13,10 +53,286 @@ export const subscribeQtCommands = function (callback) {
     var handler = function (e) {
       callback(e.detail)();
     };
-    document.addEventListener("__qt_command__", handler);
     // Return unsubscribe effect
+    return listen("__qt_command__", handler);
+  };
+};
+
+// ---------------------------------------------------------------------------
+// State sync — versioned state documents, RFC 6902 JSON patches both ways
+// ---------------------------------------------------------------------------
+//
+// PS → Python:  {"type": "state-snapshot", "component", "version", "state", "initial"}
+//               {"type": "state-patch", "component", "base", "version", "patch"}
+// Python → PS:  {"command": "state-patch", "component", "base", "patch"}
+//               {"command": "state-resync", "component"}
+//
+// publishState only records the latest document; the diff against the last
+// sent document is taken once per batch, so a burst of state changes goes
+// out as one patch.  A Python patch applies only if its base is the current
+// version; otherwise (or if it fails to apply) the page answers with a full
+// snapshot, which is also the reply to state-resync.
+
+var SYNC_BATCH_MS = 50;
+var syncs = {};
+
+function escapePointer(key) {
+  return String(key).replace(/~/g, "~0").replace(/\//g, "~1");
+}
+
+function parsePointer(pointer) {
+  if (pointer === "") return [];
+  if (pointer.charAt(0) !== "/") throw new Error("Bad JSON pointer: " + pointer);
+  return pointer.slice(1).split("/").map(function (p) {
+    return p.replace(/~1/g, "/").replace(/~0/g, "~");
+  });
+}
+
+function isObject(v) {
+  return v !== null && typeof v === "object" && !Array.isArray(v);
+}
+
+function deepEqual(a, b) {
+  if (a === b) return true;
+  if (Array.isArray(a)) {
+    if (!Array.isArray(b) || a.length !== b.length) return false;
+    for (var i = 0; i < a.length; i++) if (!deepEqual(a[i], b[i])) return false;
+    return true;
+  }
+  if (isObject(a) && isObject(b)) {
+    var ka = Object.keys(a);
+    if (ka.length !== Object.keys(b).length) return false;
+    for (var j = 0; j < ka.length; j++) {
+      if (!Object.prototype.hasOwnProperty.call(b, ka[j])) return false;
+      if (!deepEqual(a[ka[j]], b[ka[j]])) return false;
+    }
+    return true;
+  }
+  return false;
+}
+
+function clone(v) {
+  return v === undefined ? v : JSON.parse(JSON.stringify(v));
+}
+
+function diffArrays(a, b, path, ops) {
+  // Trim the common prefix and suffix so an insert or removal in the
+  // middle of a long list costs one op, not a replace of every later item
+  var start = 0;
+  while (start < a.length && start < b.length && deepEqual(a[start], b[start])) start++;
+  var endA = a.length;
+  var endB = b.length;
+  while (endA > start && endB > start && deepEqual(a[endA - 1], b[endB - 1])) {
+    endA--;
+    endB--;
+  }
+  var common = Math.min(endA, endB) - start;
+  for (var i = 0; i < common; i++) {
+    diffValues(a[start + i], b[start + i], path + "/" + (start + i), ops);
+  }
+  for (var r = start + common; r < endA; r++) {
+    ops.push({ op: "remove", path: path + "/" + (start + common) });
+  }
+  for (var n = start + common; n < endB; n++) {
+    ops.push({ op: "add", path: path + "/" + n, value: clone(b[n]) });
+  }
+}
+
+function diffValues(a, b, path, ops) {
+  if (deepEqual(a, b)) return;
+  if (Array.isArray(a) && Array.isArray(b)) {
+    diffArrays(a, b, path, ops);
+  } else if (isObject(a) && isObject(b)) {
+    Object.keys(a).forEach(function (k) {
+      if (!Object.prototype.hasOwnProperty.call(b, k)) {
+        ops.push({ op: "remove", path: path + "/" + escapePointer(k) });
+      }
+    });
+    Object.keys(b).forEach(function (k) {
+      var p = path + "/" + escapePointer(k);
+      if (Object.prototype.hasOwnProperty.call(a, k)) {
+        diffValues(a[k], b[k], p, ops);
+      } else {
+        ops.push({ op: "add", path: p, value: clone(b[k]) });
+      }
+    });
+  } else {
+    ops.push({ op: "replace", path: path, value: clone(b) });
+  }
+}
+
+function diffJson(a, b) {
+  var ops = [];
+  diffValues(a, b, "", ops);
+  return ops;
+}
+
+function getAt(doc, parts) {
+  var v = doc;
+  for (var i = 0; i < parts.length; i++) {
+    if (v === null || typeof v !== "object" || !(parts[i] in v)) {
+      throw new Error("Path not found: /" + parts.slice(0, i + 1).join("/"));
+    }
+    v = v[parts[i]];
+  }
+  return v;
+}
+
+function arrayIndex(arr, key, allowEnd) {
+  if (allowEnd && key === "-") return arr.length;
+  var i = /^(0|[1-9][0-9]*)$/.test(key) ? Number(key) : -1;
+  if (i < 0 || i > arr.length || (!allowEnd && i === arr.length)) {
+    throw new Error("Bad array index: " + key);
+  }
+  return i;
+}
+
+// Returns the new document (the root may be replaced); `doc` is mutated
+function applyOp(doc, op) {
+  var parts = parsePointer(op.path);
+  if (op.op === "test") {
+    if (!deepEqual(getAt(doc, parts), op.value)) throw new Error("Test failed at " + op.path);
+    return doc;
+  }
+  if (op.op === "move" || op.op === "copy") {
+    var from = parsePointer(op.from);
+    var value = clone(getAt(doc, from));
+    if (op.op === "move") doc = applyOp(doc, { op: "remove", path: op.from });
+    return applyOp(doc, { op: "add", path: op.path, value: value });
+  }
+  if (parts.length === 0) {
+    if (op.op === "remove") throw new Error("Cannot remove the document root");
+    return clone(op.value);
+  }
+  var key = parts[parts.length - 1];
+  var parent = getAt(doc, parts.slice(0, -1));
+  if (Array.isArray(parent)) {
+    if (op.op === "add") {
+      parent.splice(arrayIndex(parent, key, true), 0, clone(op.value));
+    } else if (op.op === "remove") {
+      parent.splice(arrayIndex(parent, key, false), 1);
+    } else if (op.op === "replace") {
+      parent[arrayIndex(parent, key, false)] = clone(op.value);
+    } else {
+      throw new Error("Unknown op: " + op.op);
+    }
+  } else if (isObject(parent)) {
+    if (op.op === "add") {
+      parent[key] = clone(op.value);
+    } else if (op.op === "remove" || op.op === "replace") {
+      if (!Object.prototype.hasOwnProperty.call(parent, key)) {
+        throw new Error("Path not found: " + op.path);
+      }
+      if (op.op === "remove") delete parent[key];
+      else parent[key] = clone(op.value);
+    } else {
+      throw new Error("Unknown op: " + op.op);
+    }
+  } else {
+    throw new Error("Not a container: " + op.path);
+  }
+  return doc;
+}
+
+// Apply a patch to a copy of `doc`; throws if any operation fails
+function applyJsonPatch(doc, patch) {
+  var out = clone(doc);
+  for (var i = 0; i < patch.length; i++) out = applyOp(out, patch[i]);
+  return out;
+}
+
+function syncFor(component) {
+  if (!syncs[component]) {
+    syncs[component] = {
+      component: component,
+      version: 0,
+      sent: undefined,    // last document Python has seen
+      current: undefined, // latest published document
+      timer: null,
+    };
+  }
+  return syncs[component];
+}
+
+function dispatch(detail) {
+  document.dispatchEvent(new CustomEvent("__ps_event__", { detail: detail }));
+}
+
+function sendSnapshot(s, initial) {
+  s.sent = s.current;
+  dispatch({
+    type: "state-snapshot",
+    component: s.component,
+    version: s.version,
+    state: s.sent,
+    initial: !!initial, // first snapshot since this bundle was loaded
+  });
+}
+
+function flushState(s) {
+  if (s.timer !== null) {
+    clearTimeout(s.timer);
+    s.timer = null;
+  }
+  if (s.sent === undefined) {
+    sendSnapshot(s, true);
+    return;
+  }
+  var ops = diffJson(s.sent, s.current);
+  if (ops.length === 0) return;
+  s.sent = s.current;
+  s.version++;
+  dispatch({
+    type: "state-patch",
+    component: s.component,
+    base: s.version - 1,
+    version: s.version,
+    patch: ops,
+  });
+}
+
+export const publishState = function (component) {
+  return function (doc) {
+    return function () {
+      var s = syncFor(component);
+      s.current = doc;
+      if (s.timer === null) {
+        s.timer = setTimeout(function () { flushState(s); }, SYNC_BATCH_MS);
+      }
+    };
+  };
+};
+
+export const subscribeState = function (component) {
+  return function (callback) {
     return function () {
-      document.removeEventListener("__qt_command__", handler);
+      var handler = function (e) {
+        var cmd = e.detail;
+        if (!cmd || cmd.component !== component) return;
+        var s = syncFor(component);
+        if (s.current === undefined) return;
+        // Local changes go out first, so the base check sees them
+        flushState(s);
+        if (cmd.command === "state-resync") {
+          sendSnapshot(s);
+          return;
+        }
+        if (cmd.command !== "state-patch") return;
+        var next;
+        try {
+          if (cmd.base !== s.version) throw new Error("stale base " + cmd.base + " != " + s.version);
+          next = applyJsonPatch(s.sent, cmd.patch || []);
+        } catch (err) {
+          console.warn("state-patch for " + component + " rejected: " + err.message);
+          sendSnapshot(s);
+          return;
+        }
+        s.version++;
+        s.sent = next;
+        s.current = next;
+        callback(next)();
+      };
+      return listen("__qt_state__", handler);
     };
   };
 };
@@ -1,81 +1,423 @@
-from pydriller import Repository
-import re
+"""
+Mine git history into segments: one file per non-overlapping interval of
+commits, resuming from a per-(repository, branch) checkpoint.
+
+Each run looks up the last commit it processed on the branch, mines only the
+commits reachable from the branch tip but not from that commit
+(``git rev-list last..tip``), writes them as a single segment and then moves
+the checkpoint.  The segment is written before the checkpoint and segment
+names are derived from the interval, so a run that crashes in between
+rewrites the segment from the same base next time, replacing the earlier
+one even if the branch tip has moved.
+
+With --jobs N the interval is split into chunks of commits that are mined
+in a process pool and merged back in commit order, so full-history mining
+of a large repository scales with the number of cores.
+
+--fields chooses what each record contains (COMMIT_FIELDS, FILE_FIELDS).  Only the
+work the requested fields need is done: commit metadata alone never diffs,
+file names and change types use a tree diff without patch text, and line
+counts or complexity are the only fields that pay for patch parsing or code
+analysis.  An authorship-only pass (--fields hash,author_date,author_email)
+costs about the same as ``git log``.
+
+Segments are streamed: each commit is written as soon as it is mined, to
+``<segment>.partial``, which is flushed every --flush-every seconds so a
+bulk loader can tail it while mining continues.  When the interval is done
+the file is renamed into place.  --format ndjson writes one commit per line;
+--format json writes the same single JSON document as before.  --format
+parquet (needs pyarrow) writes a directory per segment with a commits table
+and a modified-files table, for bulk columnar loading.
+
+Author and committer identities are resolved through the repository's
+mailmap while mining, and per-identity rollups (commits, lines added and
+deleted, files changed per day/week/month) are folded forward from each new
+segment into rollups-<bucket>.json next to the segments.  Rollups need
+author_email and author_date; line counts need files.added_lines and
+files.deleted_lines in --fields.
+
+Usage:
+    uv run python pydriller_example.py [REPO ...] [--branch BRANCH] [--out-dir DIR]
+                                       [--jobs N] [--chunk-size N] [--fields F,...]
+                                       [--format json|ndjson|parquet] [--flush-every SECONDS]
+                                       [--mailmap PATH] [--rollups none|day|week|month]
+"""
+
+import argparse
 import itertools
-from itertools import islice
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import json
+from git import NULL_TREE
+from pydriller import Git
+
+DEFAULT_REPO = Path("/work/flaming-octo-happiness")
+
 
-repo = Path("/work/flaming-octo-happiness")
-start_sha = "9df29d224fffc5e58d4f85bfdac4487b4c16ef86"
-mailmap = repo / "mailmap.txt"
+# ---------------------------------------------------------------------------
+# Mailmap
+# ---------------------------------------------------------------------------
+# git's mailmap has four line forms (see gitmailmap(5)):
+#
+#   Proper Name <commit@email>
+#   <proper@email> <commit@email>
+#   Proper Name <proper@email> <commit@email>
+#   Proper Name <proper@email> Commit Name <commit@email>
+#
+# Emails and names are matched case-insensitively.  The first three forms
+# apply to every name used with commit@email; the fourth only to that name.
+_MAILMAP_PAIR_RE = re.compile(r"([^<]*)<([^>]*)>")
 
 
 def mailmap_as_dict(mailmap_path):
     # parse mailmap file to a dictionary of
-    # (commit_email, commit_name) -> (proper_email, proper_name)
-    # so that when we compute any stats on the commit log, we can bucket everything by
-    # proper_email (i.e. use it as a key)
-    mailmap_re = re.compile(
-        r"""(?P<proper_name>[^<]+)\s+<(?P<proper_email>[^>]+)>\s*(?P<commit_name>[^<]+)?\s+<(?P<commit_email>[^>]+)>"""
-    )
-    # skip over blank lines and lines starting with a #
+    # (commit_email, commit_name or None) -> (proper_email or None, proper_name or None)
+    # keyed in lower case, so that when we compute any stats on the commit log, we can
+    # bucket everything by proper_email (i.e. use it as a key)
     mailmap_dict = {}
-    for line in filter(
-        lambda l: not (l[0] == "#" or len(l) == 0),
-        [l.rstrip() for l in mailmap_path.open()],
-    ):
-        md = mailmap_re.search(line).groupdict()
-        if md:
-            # note that the re is not 100% correct with whitespace
-            commit_name = md["commit_name"]
-            if commit_name:
-                commit_name = commit_name.strip()
-            mailmap_dict[(md["commit_email"], commit_name)] = (
-                md["proper_email"],
-                md["proper_name"],
-            )
-
+    for line in mailmap_path.open(encoding="utf-8"):
+        # skip over blank lines and comments; a trailing "# ..." after the
+        # last <email> is never matched by the pair regex
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        pairs = [(name.strip() or None, email.strip()) for name, email in _MAILMAP_PAIR_RE.findall(line)]
+        if len(pairs) == 1:
+            (proper_name, commit_email), = pairs
+            if proper_name:
+                mailmap_dict[(commit_email.lower(), None)] = (None, proper_name)
+        elif len(pairs) == 2:
+            (proper_name, proper_email), (commit_name, commit_email) = pairs
+            key = (commit_email.lower(), commit_name.lower() if commit_name else None)
+            mailmap_dict[key] = (proper_email or None, proper_name)
+        else:
+            print(f"{mailmap_path}: ignoring malformed mailmap line {line!r}", file=sys.stderr)
     return mailmap_dict
 
 
-mailmap_dict = mailmap_as_dict(mailmap)
-
-commits = []
-# the from_commit gives us a way of 'tailing the log'
-# we have to use islice because traverse_commits returns a generator
-# We start at 1 since we don't want to re-process the commit we used as the
-# starting point.
-
-# this code is accumulating a multi-tree of changes since a particular
-# commit (which we will likely obtain on the basis of some ranking (ROW_NUMBER() OVER
-# (PARTITION BY repository, ts, rn_within_chunk))
-
-for commit in islice(
-    Repository(str(repo), from_commit=start_sha).traverse_commits(),
-    1,
-    None,
-):
-    # use the time_t for the author_date as it is unambiguous and is trivially
-    # JSON serializable.
-    this_commit = dict(
-        hash=commit.hash,
-        author_date=commit.author_date.timestamp(),
-        author_name=commit.author.name,
-        author_email=commit.author.email,
-    )
-    this_commit["modified_files"] = list(
-        [
-            dict(
-                change_type=m.change_type.name,
-                added_lines=m.added_lines,
-                deleted_lines=m.deleted_lines,
-                complexity=m.complexity,
+def resolve_identity(mailmap_dict, name, email):
+    """Map a commit (name, email) to its proper (name, email), as git does."""
+    if email is None:
+        return name, email
+    entry = mailmap_dict.get((email.lower(), name.lower() if name else None))
+    if entry is None:
+        entry = mailmap_dict.get((email.lower(), None))
+    if entry is None:
+        return name, email
+    proper_email, proper_name = entry
+    return proper_name or name, proper_email or email
+
+
+def apply_mailmap(mailmap_dict, record):
+    """Rewrite author/committer identity fields of a record in place."""
+    for role in ("author", "committer"):
+        email_key, name_key = f"{role}_email", f"{role}_name"
+        if email_key in record:
+            name, email = resolve_identity(mailmap_dict, record.get(name_key), record[email_key])
+            record[email_key] = email
+            if name_key in record:
+                record[name_key] = name
+    return record
+
+
+def find_mailmap(repo_path):
+    for name in (".mailmap", "mailmap.txt"):
+        if (repo_path / name).is_file():
+            return repo_path / name
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Rollups
+# ---------------------------------------------------------------------------
+# Per-identity aggregates per time bucket, kept next to the segments and
+# folded forward one segment at a time.  Segments are recorded by base
+# commit, and the last one's counts are kept, so a re-run of that interval
+# (which rewrites the segment, maybe up to a newer tip) replaces its
+# contribution instead of adding it again.
+BUCKETS = {
+    "day": lambda d: d.strftime("%Y-%m-%d"),
+    "week": lambda d: "{0}-W{1:02d}".format(*d.isocalendar()),
+    "month": lambda d: d.strftime("%Y-%m"),
+}
+
+
+class Rollups:
+    """Accumulates commits, line counts and file changes per identity and bucket."""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self._bucket_key = BUCKETS[bucket]
+        self.identities = {}
+
+    def add(self, record):
+        email = record.get("author_email")
+        date = record.get("author_date")
+        if email is None or date is None:
+            return
+        key = self._bucket_key(datetime.fromtimestamp(date, timezone.utc))
+        identity = self.identities.setdefault(
+            email.lower(), {"name": record.get("author_name"), "buckets": {}}
+        )
+        if record.get("author_name"):
+            identity["name"] = record["author_name"]
+        stats = identity["buckets"].setdefault(
+            key, {"commits": 0, "added_lines": 0, "deleted_lines": 0, "files_changed": 0}
+        )
+        stats["commits"] += 1
+        for f in record.get("modified_files", ()):
+            stats["files_changed"] += 1
+            stats["added_lines"] += f.get("added_lines") or 0
+            stats["deleted_lines"] += f.get("deleted_lines") or 0
+
+    def merge_into(self, path, segment_id):
+        """Fold these counts into the rollups file at `path`, once per segment.
+
+        `segment_id` names the segment's base commit.  The checkpoint moves
+        after the rollups are written, so only the most recently applied
+        segment can come round again (its tip may have moved since); its
+        contribution is kept in the file and replaced rather than skipped.
+        """
+        try:
+            saved = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            saved = {"bucket": self.bucket, "applied_segments": [], "identities": {}}
+        if saved["bucket"] != self.bucket:
+            raise RuntimeError(f"{path} is bucketed by {saved['bucket']}, not {self.bucket}")
+        last = saved.get("last_segment")
+        if segment_id in saved["applied_segments"]:
+            if last is None or last["id"] != segment_id:
+                return False
+            _fold(saved["identities"], last["identities"], -1)
+        else:
+            saved["applied_segments"].append(segment_id)
+        _fold(saved["identities"], self.identities, 1)
+        saved["last_segment"] = {"id": segment_id, "identities": self.identities}
+        write_atomic(path, json.dumps(saved, indent=1, sort_keys=True))
+        return True
+
+
+def _fold(identities, delta, sign):
+    """Add (sign 1) or take back (sign -1) per-identity bucket counts."""
+    for email, identity in delta.items():
+        target = identities.setdefault(email, {"name": identity["name"], "buckets": {}})
+        if sign > 0:
+            target["name"] = identity["name"] or target["name"]
+        for key, stats in identity["buckets"].items():
+            bucket = target["buckets"].setdefault(key, dict.fromkeys(stats, 0))
+            for stat, value in stats.items():
+                bucket[stat] = bucket.get(stat, 0) + sign * value
+            if not any(bucket.values()):
+                del target["buckets"][key]
+        if not target["buckets"]:
+            del identities[email]
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+# The checkpoint file maps "<repo path>#<branch>" to the last commit that has
+# been written to a segment.  It is small and rewritten whole, atomically.
+
+
+def load_checkpoints(path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def save_checkpoints(path, checkpoints):
+    write_atomic(path, json.dumps(checkpoints, indent=2, sort_keys=True))
+
+
+def write_atomic(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Mining
+# ---------------------------------------------------------------------------
+def new_commits(git, branch, last_commit, start_sha=None):
+    """Hashes on `branch` that are not yet mined, oldest first.
+
+    The interval is last_commit..tip, so merged-in side branches are
+    included and nothing already mined is repeated.  On the first run the
+    interval starts at start_sha (exclusive) if given, else at the root.
+    """
+    tip = git.repo.git.rev_parse(branch)
+    base = last_commit or start_sha
+    if base:
+        if base == tip:
+            return tip, []
+        if not git.repo.is_ancestor(base, tip):
+            raise RuntimeError(
+                f"{base[:12]} is not an ancestor of {branch} ({tip[:12]}); "
+                f"history was rewritten — remove the checkpoint to re-mine"
             )
+        spec = f"{base}..{tip}"
+    else:
+        spec = tip
+    out = git.repo.git.rev_list("--reverse", spec)
+    return tip, out.split() if out else []
+
+
+# ---------------------------------------------------------------------------
+# Field projection
+# ---------------------------------------------------------------------------
+# Commit fields come from the commit object itself.  File fields are written
+# "files.<name>" and fall in three cost tiers: the tree diff (no patch text),
+# the patch (line counts), and code analysis (lizard, per modified file).
+#
+# use the time_t for dates as it is unambiguous and is trivially JSON serializable.
+COMMIT_FIELDS = {
+    "hash": lambda c: c.hash,
+    "author_date": lambda c: c.author_date.timestamp(),
+    "author_name": lambda c: c.author.name,
+    "author_email": lambda c: c.author.email,
+    "committer_date": lambda c: c.committer_date.timestamp(),
+    "committer_name": lambda c: c.committer.name,
+    "committer_email": lambda c: c.committer.email,
+    "msg": lambda c: c.msg,
+    "parents": lambda c: c.parents,
+    "merge": lambda c: c.merge,
+}
+FILE_TREE_FIELDS = ("filename", "change_type", "old_path", "new_path")
+FILE_PATCH_FIELDS = ("added_lines", "deleted_lines")
+FILE_METRIC_FIELDS = ("complexity", "nloc", "token_count")
+FILE_FIELDS = FILE_TREE_FIELDS + FILE_PATCH_FIELDS + FILE_METRIC_FIELDS
+
+DEFAULT_FIELDS = (
+    "hash,author_date,author_name,author_email,"
+    "files.change_type,files.added_lines,files.deleted_lines,files.complexity"
+)
+
+
+def parse_fields(spec):
+    """Split 'hash,author_email,files.filename' into (commit, file) field tuples."""
+    commit_fields, file_fields = [], []
+    for name in (f.strip() for f in spec.split(",")):
+        if not name:
+            continue
+        if name.startswith("files."):
+            if name[6:] not in FILE_FIELDS:
+                raise ValueError(f"unknown file field {name!r}; choose from files.{FILE_FIELDS}")
+            file_fields.append(name[6:])
+        elif name in COMMIT_FIELDS:
+            commit_fields.append(name)
+        else:
+            raise ValueError(f"unknown field {name!r}; choose from {tuple(COMMIT_FIELDS)}")
+    return tuple(commit_fields), tuple(file_fields)
+
+
+def _change_type(diff):
+    # Same classification as pydriller's ModifiedFile.change_type
+    if diff.new_file:
+        return "ADD"
+    if diff.deleted_file:
+        return "DELETE"
+    if diff.renamed_file:
+        return "RENAME"
+    if diff.a_blob and diff.b_blob and diff.a_blob != diff.b_blob:
+        return "MODIFY"
+    return "UNKNOWN"
+
+
+def _tree_changes(git, sha, file_fields):
+    """File-level facts from a raw tree diff, without generating patch text."""
+    c = git.repo.commit(sha)
+    if len(c.parents) > 1:
+        # pydriller reports no modified files for merge commits either
+        return []
+    if c.parents:
+        diffs = c.parents[0].diff(c, create_patch=False)
+    else:
+        diffs = c.diff(NULL_TREE, create_patch=False, R=True)
+    files = []
+    for d in diffs:
+        old_path = None if d.new_file else d.a_path
+        new_path = None if d.deleted_file else d.b_path
+        values = dict(
+            filename=os.path.basename(new_path or old_path),
+            change_type=_change_type(d),
+            old_path=old_path,
+            new_path=new_path,
+        )
+        files.append({f: values[f] for f in file_fields})
+    return files
+
+
+def _modified_file_value(m, field):
+    if field == "change_type":
+        return m.change_type.name
+    return getattr(m, field)
+
+
+def commit_record(git, sha, commit_fields, file_fields):
+    """One commit as a dict holding only the projected fields."""
+    commit = git.get_commit(sha)
+    this_commit = {f: COMMIT_FIELDS[f](commit) for f in commit_fields}
+    if not file_fields:
+        return this_commit
+    if all(f in FILE_TREE_FIELDS for f in file_fields):
+        this_commit["modified_files"] = _tree_changes(git, sha, file_fields)
+    else:
+        # Patch parsing, and lizard only if a metric field is requested
+        # (pydriller computes complexity/nloc/token_count lazily on access)
+        this_commit["modified_files"] = [
+            {f: _modified_file_value(m, f) for f in file_fields}
             for m in commit.modified_files
         ]
-    )
-    commits.append(this_commit)
+    return this_commit
+
+
+def _mine_chunk(repo_path, hashes, fields):
+    """Worker: one Git handle per chunk, records in the order given."""
+    git = Git(repo_path)
+    return [commit_record(git, h, *fields) for h in hashes]
+
+
+def mine_commits(repo_path, hashes, fields, jobs=1, chunk_size=200):
+    """Yield a record per commit, in the order of `hashes`.
+
+    With jobs > 1 the hashes are mined in chunks by a process pool.  At most
+    2 * jobs chunks are in flight, and chunks are consumed strictly in
+    submission order, so output order (and memory) does not depend on which
+    worker finishes first.
+    """
+    if jobs <= 1:
+        git = Git(str(repo_path))
+        for h in hashes:
+            yield commit_record(git, h, *fields)
+        return
+
+    chunks = (hashes[i : i + chunk_size] for i in range(0, len(hashes), chunk_size))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque(
+            pool.submit(_mine_chunk, str(repo_path), chunk, fields)
+            for chunk in itertools.islice(chunks, 2 * jobs)
+        )
+        while pending:
+            records = pending.popleft().result()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(pool.submit(_mine_chunk, str(repo_path), chunk, fields))
+            yield from records
+
 
 # The idea behind one single blob of JSON is that it will be much easier to persist to
 # the database than using an ORM and we can write queries against the blob to normalize the data
@@ -101,15 +443,342 @@ for commit in islice(
 
 # there seems to be some idea of *inverting* the log into the set of facts that generated the
 # log in the first place.
-print(json.dumps(commits))
-
-# # now we traverse over the commits but this time mapping commit e-mails and names
-# # to proper e-mails and names.
-# for c in commits:
-#     commit_t = (
-#         c["author_email"],
-#         c["author_name"],
-#     )
-#     if commit_t in mailmap_dict:
-#         proper_t = mailmap_dict[commit_t]
-#         print(f"mapping {commit_t} to {proper_t}")
+
+
+# ---------------------------------------------------------------------------
+# Segment writers
+# ---------------------------------------------------------------------------
+class SegmentWriter:
+    """Stream records into <path>.partial, then rename it to <path> on close.
+
+    Subclasses provide _begin/_write_record/_end.  Memory use is constant in
+    the number of commits.
+    """
+
+    suffix = ""
+
+    def __init__(self, path, header, flush_every=1.0):
+        self.path = path
+        self.partial = path.with_name(path.name + ".partial")
+        self.header = header
+        self.flush_every = flush_every
+        self.count = 0
+        self._last_flush = time.monotonic()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.partial.open("w", encoding="utf-8")
+        self._begin()
+
+    def write(self, record):
+        self._write_record(record)
+        self.count += 1
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_every:
+            self._flush()
+            self._last_flush = now
+
+    def _flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._end()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.partial, self.path)
+
+    def abort(self):
+        self._file.close()
+        self.partial.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _begin(self):
+        pass
+
+    def _write_record(self, record):
+        raise NotImplementedError
+
+    def _end(self):
+        pass
+
+
+class NdjsonSegmentWriter(SegmentWriter):
+    """One JSON object per line, one line per commit."""
+
+    suffix = ".ndjson"
+
+    def _write_record(self, record):
+        self._file.write(json.dumps(record))
+        self._file.write("\n")
+
+
+class JsonSegmentWriter(SegmentWriter):
+    """The segment as a single JSON document: the header plus a commits array."""
+
+    suffix = ".json"
+
+    def _begin(self):
+        # Header keys, then the commits array written incrementally
+        self._file.write(json.dumps(self.header)[:-1] + ', "commits": [')
+
+    def _write_record(self, record):
+        if self.count:
+            self._file.write(",\n")
+        self._file.write(json.dumps(record))
+
+    def _end(self):
+        self._file.write("]}\n")
+
+
+# Arrow types for Parquet columns; anything not listed is a plain string.
+# Low-cardinality columns are dictionary-encoded so they load as categoricals
+# and stay dictionary pages on disk.
+DICTIONARY_COLUMNS = {"author_name", "author_email", "committer_name", "committer_email",
+                      "change_type"}
+
+
+def _arrow_column(pa, name, values):
+    if name in DICTIONARY_COLUMNS:
+        return pa.array(values, pa.string()).dictionary_encode()
+    if name.endswith("_date"):
+        micros = [None if v is None else round(v * 1_000_000) for v in values]
+        return pa.array(micros, pa.int64()).cast(pa.timestamp("us", tz="UTC"))
+    if name == "parents":
+        return pa.array(values, pa.list_(pa.string()))
+    if name == "merge":
+        return pa.array(values, pa.bool_())
+    if name in FILE_PATCH_FIELDS or name in FILE_METRIC_FIELDS:
+        return pa.array(values, pa.int64())
+    return pa.array(values, pa.string())
+
+
+class _ParquetTable:
+    """Row buffer for one Parquet file, written out a row group at a time."""
+
+    def __init__(self, pa, pq, path, row_group_size):
+        self._pa, self._pq = pa, pq
+        self.path = path
+        self.row_group_size = row_group_size
+        self._columns = {}
+        self._rows = 0
+        self._writer = None
+
+    def append(self, row):
+        for name, value in row.items():
+            self._columns.setdefault(name, [None] * self._rows).append(value)
+        self._rows += 1
+        if self._rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        table = self._pa.table(
+            {name: _arrow_column(self._pa, name, values) for name, values in self._columns.items()}
+        )
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+        self._columns = {name: [] for name in self._columns}
+        self._rows = 0
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+class ParquetSegmentWriter(SegmentWriter):
+    """The segment as a directory of two Parquet tables.
+
+    commits.parquet has one row per commit with the projected commit fields;
+    files.parquet has one row per modified file, linked by commit_hash.
+    files.parquet is only written when file fields are projected.  Rows are
+    buffered and written in row groups of ROW_GROUP_SIZE, so memory stays
+    bounded; the Parquet footer is only written at the end, so unlike the
+    JSON formats the partial segment cannot be read while mining.
+    """
+
+    suffix = ".parquet"
+    ROW_GROUP_SIZE = 50_000
+
+    def __init__(self, path, header, flush_every=1.0):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.partial = path.with_name(path.name + ".partial")
+        self.header = header
+        self.flush_every = flush_every
+        self.count = 0
+        self._last_flush = time.monotonic()
+        shutil.rmtree(self.partial, ignore_errors=True)
+        self.partial.mkdir(parents=True)
+        self._commits = _ParquetTable(pa, pq, self.partial / "commits.parquet", self.ROW_GROUP_SIZE)
+        self._files = _ParquetTable(pa, pq, self.partial / "files.parquet", self.ROW_GROUP_SIZE)
+
+    def _write_record(self, record):
+        files = record.get("modified_files")
+        self._commits.append({k: v for k, v in record.items() if k != "modified_files"})
+        for f in files or ():
+            self._files.append({"commit_hash": record["hash"], **f})
+
+    def _flush(self):
+        # Row groups are written by size, not time
+        pass
+
+    def close(self):
+        self._commits.close()
+        self._files.close()
+        write_atomic(self.partial / "segment.json", json.dumps(self.header))
+        # A rerun of a crashed interval may find the finished directory
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.partial, self.path)
+
+    def abort(self):
+        shutil.rmtree(self.partial, ignore_errors=True)
+
+
+WRITERS = {
+    "json": JsonSegmentWriter,
+    "ndjson": NdjsonSegmentWriter,
+    "parquet": ParquetSegmentWriter,
+}
+
+
+def segment_start(base):
+    """The part of a segment name that identifies its base commit."""
+    return base[:12] if base else "root"
+
+
+def segment_path(out_dir, repo_path, branch, base, tip, suffix):
+    """Deterministic segment name for the interval base..tip."""
+    safe_branch = re.sub(r"[^\w.-]", "_", branch)
+    return out_dir / repo_path.name / safe_branch / f"{segment_start(base)}..{tip[:12]}{suffix}"
+
+
+def remove_superseded(path, base):
+    """Delete segments from the same base as `path` but with another tip.
+
+    They are left by a run that crashed before its checkpoint while the
+    branch tip moved on; `path` covers all of their commits.
+    """
+    for old in path.parent.glob(f"{segment_start(base)}..*"):
+        if old == path or old.name.endswith((".partial", ".tmp")):
+            continue
+        if old.is_dir():
+            shutil.rmtree(old)
+        else:
+            old.unlink()
+
+
+def mine_repository(repo_path, checkpoints, args):
+    """Mine one repository/branch interval.  Returns the segment path or None."""
+    branch, out_dir, start_sha = args.branch, args.out_dir, args.start_sha
+    git = Git(str(repo_path))
+    if branch is None:
+        branch = "HEAD" if git.repo.head.is_detached else git.repo.active_branch.name
+    key = f"{repo_path}#{branch}"
+    last_commit = checkpoints.get(key, {}).get("last_commit")
+
+    tip, hashes = new_commits(git, branch, last_commit, start_sha)
+    if not hashes:
+        print(f"{key}: up to date at {tip[:12]}", file=sys.stderr)
+        return None
+
+    base = last_commit or start_sha
+    header = dict(
+        repository=str(repo_path),
+        branch=branch,
+        from_commit=base,
+        to_commit=tip,
+    )
+    mailmap_path = args.mailmap or find_mailmap(repo_path)
+    mailmap_dict = mailmap_as_dict(mailmap_path) if mailmap_path else {}
+    rollups = Rollups(args.rollups) if args.rollups != "none" else None
+
+    writer_cls = WRITERS[args.format]
+    path = segment_path(out_dir, repo_path, branch, base, tip, writer_cls.suffix)
+    # Segment, then rollups, then checkpoint: a crash in between re-mines
+    # from the same base.  The new segment replaces the old one (also when
+    # the tip has moved), and so does its contribution to the rollups.
+    with writer_cls(path, header, args.flush_every) as writer:
+        for record in mine_commits(repo_path, hashes, args.fields, args.jobs, args.chunk_size):
+            if mailmap_dict:
+                apply_mailmap(mailmap_dict, record)
+            if rollups:
+                rollups.add(record)
+            writer.write(record)
+    remove_superseded(path, base)
+    if rollups:
+        rollups.merge_into(path.parent / f"rollups-{rollups.bucket}.json", segment_start(base))
+    checkpoints[key] = dict(header, last_commit=tip, segment=str(path))
+    print(f"{key}: {writer.count} commits -> {path}", file=sys.stderr)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mine new commits from git repositories into checkpointed segments."
+    )
+    parser.add_argument("repos", nargs="*", type=Path, default=[DEFAULT_REPO],
+                        help=f"Repositories to mine (default: {DEFAULT_REPO})")
+    parser.add_argument("--branch", default=None,
+                        help="Branch to follow (default: each repo's current branch)")
+    parser.add_argument("--out-dir", type=Path, default=Path("segments"),
+                        help="Where segments are written (default: ./segments)")
+    parser.add_argument("--checkpoints", type=Path, default=None,
+                        help="Checkpoint file (default: OUT_DIR/checkpoints.json)")
+    parser.add_argument("--start-sha", default=None,
+                        help="On the first run, mine only commits after this one")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes (default: 1, mine in-process)")
+    parser.add_argument("--chunk-size", type=int, default=200,
+                        help="Commits per worker task (default: 200)")
+    parser.add_argument("--fields", default=DEFAULT_FIELDS,
+                        help=f"Comma-separated fields to produce (default: {DEFAULT_FIELDS})")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="json",
+                        help="Segment format (default: json)")
+    parser.add_argument("--flush-every", type=float, default=1.0,
+                        help="Seconds between flushes of the partial segment (default: 1)")
+    parser.add_argument("--mailmap", type=Path, default=None,
+                        help="Mailmap applied to identities (default: the repo's "
+                             ".mailmap or mailmap.txt, if any)")
+    parser.add_argument("--rollups", choices=["none", *BUCKETS], default="month",
+                        help="Time bucket for per-identity rollups (default: month)")
+    args = parser.parse_args()
+    try:
+        args.fields = parse_fields(args.fields)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.format == "parquet" and args.fields[1] and "hash" not in args.fields[0]:
+        parser.error("--format parquet links files to commits by hash; add hash to --fields")
+
+    checkpoint_path = args.checkpoints or args.out_dir / "checkpoints.json"
+    checkpoints = load_checkpoints(checkpoint_path)
+
+    failed = False
+    for repo_path in args.repos:
+        repo_path = repo_path.expanduser().resolve()
+        try:
+            if mine_repository(repo_path, checkpoints, args):
+                save_checkpoints(checkpoint_path, checkpoints)
+        except Exception as e:
+            # One bad repository should not stop a nightly run over hundreds
+            print(f"{repo_path}: {e}", file=sys.stderr)
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
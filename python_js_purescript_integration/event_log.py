@@ -0,0 +1,291 @@
+"""Buffered console and event log shared by the WebEngine launchers.
+
+The launchers used to print every JS console message, bridge log line and
+page event straight to the terminal with flush=True, on the GUI thread.  A
+chatty page then spends much of its event loop in terminal I/O.  EventLog
+moves that work off the GUI thread:
+
+  * emit() checks the level and source filters first, then appends the raw
+    (time, level, source, format, args) record to a bounded deque.  Nothing
+    is formatted and no lock is taken; deque.append is atomic.  When the
+    buffer is full the oldest records are dropped and counted.
+  * A daemon writer thread wakes every `interval` seconds, formats whatever
+    has accumulated and writes it to stdout or a file in one write/flush.
+  * Each source may emit at most `rate_limit` records per `rate_window`
+    seconds; the excess is dropped and reported as one summary line per
+    window.  ERROR records are never rate-limited.
+
+Drop counters only ever go up, and only producers write them; the writer
+remembers how much it has reported and prints the difference.  Without a
+lock, producers on different threads logging the same source can still
+lose an increment, so drop and rate counts are approximate under that
+kind of contention.
+
+Records are formatted on the writer thread, so pass arguments that will not
+change afterwards (strings, numbers, parsed JSON that is not mutated).
+
+Usage:
+    import event_log
+
+    event_log.add_arguments(parser)          # --log-file, --log-level, ...
+    args = parser.parse_args()
+    log = event_log.configure_from_args(args)
+
+    log.info("bridge", "connected to %s", url)
+    page = event_log.ConsolePage()           # JS console → log source "JS"
+
+Launchers outside this directory put it on sys.path first, as they already
+do for pdf_server.
+"""
+
+import atexit
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from PySide6.QtWebEngineCore import QWebEnginePage
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+
+class Json:
+    """Argument wrapper that serialises its value only when the record is written."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return json.dumps(self.value)
+
+
+class EventLog:
+    """Ring-buffered log with a background writer thread.
+
+    level       records below this level are discarded before buffering
+    sources     iterable of source names to keep (None keeps all)
+    muted       iterable of source names to discard
+    path        append to this file instead of writing to `stream`
+    capacity    ring buffer size; the oldest records are dropped beyond it
+    interval    seconds between writer flushes
+    rate_limit  records per source per `rate_window` seconds (0 = unlimited)
+    """
+
+    def __init__(self, level=DEBUG, sources=None, muted=(), path=None, stream=None,
+                 capacity=10000, interval=0.05, rate_limit=200, rate_window=1.0):
+        self.level = level
+        self.sources = set(sources) if sources is not None else None
+        self.muted = set(muted)
+        self.path = path
+        self.capacity = capacity
+        self.interval = interval
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+
+        self._buffer = deque(maxlen=capacity)
+        self._overflowed = 0
+        self._overflow_reported = 0
+        # source → [window start, count in window, suppressed in total]
+        self._rates = {}
+        # source → [time of last summary, suppressed count it reported up to]
+        self._reported = {}
+        self._file = open(path, "a", encoding="utf-8") if path else None
+        self._stream = self._file or stream or sys.stdout
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Producer side (any thread) ------------------------------------------
+    def enabled(self, level, source):
+        """True if a record at this level from this source would be kept."""
+        if level < self.level or source in self.muted:
+            return False
+        return self.sources is None or source in self.sources
+
+    def emit(self, level, source, fmt, *args):
+        """Queue a record; formatting (fmt % args) happens on the writer thread."""
+        if not self.enabled(level, source):
+            return False
+        now = time.time()
+        if self.rate_limit and level < ERROR:
+            rate = self._rates.get(source)
+            if rate is None:
+                rate = self._rates[source] = [now, 0, 0]
+            elif now - rate[0] >= self.rate_window:
+                rate[0] = now
+                rate[1] = 0
+            rate[1] += 1
+            if rate[1] > self.rate_limit:
+                rate[2] += 1
+                return False
+        if len(self._buffer) >= self.capacity:
+            self._overflowed += 1
+        self._buffer.append((now, level, source, fmt, args))
+        return True
+
+    def debug(self, source, fmt, *args):
+        return self.emit(DEBUG, source, fmt, *args)
+
+    def info(self, source, fmt, *args):
+        return self.emit(INFO, source, fmt, *args)
+
+    def warning(self, source, fmt, *args):
+        return self.emit(WARNING, source, fmt, *args)
+
+    def error(self, source, fmt, *args):
+        return self.emit(ERROR, source, fmt, *args)
+
+    # --- Writer side ---------------------------------------------------------
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def close(self):
+        """Stop the writer thread and write out everything still buffered."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._stream = sys.stdout
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:  # never let a bad record kill the writer
+                print(f"  [log] writer error: {e}", file=sys.stderr, flush=True)
+
+    def flush(self):
+        """Format and write the buffered records in one batch."""
+        lines = []
+        buffer = self._buffer
+        while True:
+            try:
+                record = buffer.popleft()
+            except IndexError:
+                break
+            lines.append(self._format(*record))
+        lines.extend(self._summaries())
+        if lines:
+            self._stream.write("\n".join(lines) + "\n")
+            self._stream.flush()
+
+    def _summaries(self):
+        now = time.time()
+        out = []
+        overflowed = self._overflowed
+        if overflowed != self._overflow_reported:
+            n = overflowed - self._overflow_reported
+            self._overflow_reported = overflowed
+            out.append(self._format(now, WARNING, "log", "buffer full, dropped %d record(s)", (n,)))
+        for source, rate in list(self._rates.items()):
+            reported = self._reported.setdefault(source, [0, 0])
+            suppressed = rate[2]
+            n = suppressed - reported[1]
+            if not n or now - reported[0] < self.rate_window:
+                continue
+            reported[:] = [now, suppressed]
+            out.append(self._format(
+                now, WARNING, "log", "%s: suppressed %d record(s) over the %g/%gs rate limit",
+                (source, n, self.rate_limit, self.rate_window),
+            ))
+        return out
+
+    @staticmethod
+    def _format(t, level, source, fmt, args):
+        try:
+            message = fmt % args if args else fmt
+        except (TypeError, ValueError):
+            message = f"{fmt} {args!r}"
+        ts = datetime.fromtimestamp(t).strftime("%H:%M:%S.%f")[:-3]
+        if level == INFO:
+            return f"  [{source} {ts}] {message}"
+        return f"  [{source} {ts}] {LEVEL_NAMES.get(level, level)}: {message}"
+
+
+# ---------------------------------------------------------------------------
+# Process-wide log
+# ---------------------------------------------------------------------------
+_log = None
+
+
+def get_log():
+    """The shared EventLog, started with default settings on first use."""
+    global _log
+    if _log is None:
+        _log = EventLog().start()
+    return _log
+
+
+def configure(**kwargs):
+    """Replace the shared EventLog; kwargs are EventLog's."""
+    global _log
+    if _log is not None:
+        _log.close()
+    _log = EventLog(**kwargs).start()
+    return _log
+
+
+def add_arguments(parser):
+    group = parser.add_argument_group("logging")
+    group.add_argument("--log-file", help="Append log records to this file instead of stdout")
+    group.add_argument(
+        "--log-level", choices=list(LEVELS), default="DEBUG",
+        help="Discard records below this level (default: DEBUG)",
+    )
+    group.add_argument(
+        "--log-sources",
+        help="Comma-separated sources to show, e.g. JS,bridge; prefix with - to hide one (-JS)",
+    )
+    group.add_argument(
+        "--log-rate", type=int, default=200,
+        help="Max records per source per second; the rest are summarised (0 = unlimited)",
+    )
+
+
+def configure_from_args(args):
+    sources, muted = None, set()
+    if args.log_sources:
+        for name in (s.strip() for s in args.log_sources.split(",")):
+            if name.startswith("-"):
+                muted.add(name[1:])
+            elif name:
+                sources = (sources or set()) | {name}
+    return configure(
+        level=LEVELS[args.log_level],
+        sources=sources,
+        muted=muted,
+        path=args.log_file,
+        rate_limit=args.log_rate,
+    )
+
+
+# ---------------------------------------------------------------------------
+# ConsolePage — JS console.log/warn/error → shared log, source "JS"
+# ---------------------------------------------------------------------------
+_JS_LEVELS = {
+    QWebEnginePage.JavaScriptConsoleMessageLevel.InfoMessageLevel: INFO,
+    QWebEnginePage.JavaScriptConsoleMessageLevel.WarningMessageLevel: WARNING,
+    QWebEnginePage.JavaScriptConsoleMessageLevel.ErrorMessageLevel: ERROR,
+}
+
+
+class ConsolePage(QWebEnginePage):
+    def javaScriptConsoleMessage(self, level, message, line, source):
+        get_log().emit(_JS_LEVELS.get(level, DEBUG), "JS", "%s:%s: %s", source, line, message)
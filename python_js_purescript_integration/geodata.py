@@ -7,38 +7,50 @@ for use with Leaflet.
 build_metadata() inspects feature properties and produces a canonical
 mapping so that downstream code (JS bridge, Python event handlers) can
 work with consistent field names regardless of the source dataset.
+
+AttributeTable keeps an overlay's feature properties in Python, column by
+column, so they can be read and written in bulk and the changes sent to the
+map in one batch.
 """
 
 import json
 from pathlib import Path
 
+import pandas as pd
 
-def load_geo_file(path_str):
-    """Load a GeoJSON, Shapefile, or zipped Shapefile and return a GeoJSON string.
+GEO_SUFFIXES = (".geojson", ".json", ".shp", ".zip")
 
-    Supports .geojson/.json (read as-is), .shp, and .zip (via geopandas).
-    """
+
+def _resolve(path_str):
     p = Path(path_str).expanduser().resolve()
     if not p.exists():
         raise FileNotFoundError(f"File not found: {p}")
-
     ext = p.suffix.lower()
+    if ext not in GEO_SUFFIXES:
+        raise ValueError(f"Unsupported format: {ext} (expected .geojson, .json, .shp, or .zip)")
+    return p, ext
+
+
+def load_geo_frame(path_str):
+    """Load a GeoJSON, Shapefile, or zipped Shapefile as a GeoDataFrame in
+    EPSG:4326 (WGS84), the CRS Leaflet expects."""
+    import geopandas as gpd
+    p, ext = _resolve(path_str)
+    gdf = gpd.read_file(f"zip://{p}" if ext == ".zip" else str(p))
+    if gdf.crs and not gdf.crs.equals("EPSG:4326"):
+        gdf = gdf.to_crs(epsg=4326)
+    return gdf
+
+
+def load_geo_file(path_str):
+    """Load a GeoJSON, Shapefile, or zipped Shapefile and return a GeoJSON string.
+
+    Supports .geojson/.json (read as-is), .shp, and .zip (via geopandas).
+    """
+    p, ext = _resolve(path_str)
     if ext in (".geojson", ".json"):
         return p.read_text(encoding="utf-8")
-    elif ext == ".shp":
-        import geopandas as gpd
-        gdf = gpd.read_file(str(p))
-        if gdf.crs and not gdf.crs.equals("EPSG:4326"):
-            gdf = gdf.to_crs(epsg=4326)
-        return gdf.to_json()
-    elif ext == ".zip":
-        import geopandas as gpd
-        gdf = gpd.read_file(f"zip://{p}")
-        if gdf.crs and not gdf.crs.equals("EPSG:4326"):
-            gdf = gdf.to_crs(epsg=4326)
-        return gdf.to_json()
-    else:
-        raise ValueError(f"Unsupported format: {ext} (expected .geojson, .json, .shp, or .zip)")
+    return load_geo_frame(p).to_json()
 
 
 def build_metadata(geojson_str, source_path):
@@ -106,3 +118,106 @@ def build_metadata(geojson_str, source_path):
         "label": Path(source_path).stem,
         "mapping": mapping,
     }
+
+
+class AttributeTable:
+    """Feature attributes of one map overlay, held column by column.
+
+    Built from the GeoDataFrame the overlay was drawn from, minus the
+    geometry.  Row i is the i-th feature sent to the map, which is the
+    ``feature`` index carried by map events.
+
+    get() and set() work on whole columns or row subsets with pandas.
+    set() only records rows whose value actually changes, and
+    take_changes() hands all pending changes over as one payload for the
+    bridge (leaflet_bridge.js, attributesChanged).
+    """
+
+    def __init__(self, overlay, frame):
+        self.overlay = overlay
+        self.frame = pd.DataFrame(frame).reset_index(drop=True)
+        self.popup = []          # extra columns listed in each feature's popup
+        self._dirty = {}         # column → set of changed rows
+        self._popup_dirty = False
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def columns(self):
+        return list(self.frame.columns)
+
+    def get(self, columns=None, rows=None):
+        """A DataFrame of ``columns`` (default: all) at feature ``rows`` (default: all)."""
+        columns = self.columns if columns is None else list(columns)
+        if rows is None:
+            return self.frame[columns].copy()
+        return self.frame.loc[list(rows), columns]
+
+    def row(self, feature):
+        """One feature's attributes as a dict."""
+        return self.frame.iloc[feature].to_dict()
+
+    def set(self, column, values, rows=None):
+        """Write one column: a scalar or sequence for ``rows`` (default: all),
+        or a Series indexed by feature.  A new column name adds a column.
+        Returns the number of values that changed."""
+        if isinstance(values, pd.Series) and rows is None:
+            new = values
+        else:
+            index = self.frame.index if rows is None else pd.Index(rows)
+            new = pd.Series(values, index=index)
+        if not new.index.isin(self.frame.index).all():
+            raise IndexError(f"Overlay {self.overlay} has {len(self.frame)} features")
+        if column in self.frame.columns:
+            old = self.frame.loc[new.index, column]
+            new = new[~((old == new) | (old.isna() & new.isna()))]
+        else:
+            self.frame[column] = pd.Series(None, index=self.frame.index, dtype=object)
+        if new.empty:
+            return 0
+        try:
+            self.frame.loc[new.index, column] = new
+        except (TypeError, ValueError):
+            # e.g. text into a numeric column: widen it rather than refuse
+            self.frame[column] = self.frame[column].astype(object)
+            self.frame.loc[new.index, column] = new
+        self._dirty.setdefault(column, set()).update(new.index.tolist())
+        return len(new)
+
+    def update(self, frame):
+        """set() every column of a DataFrame indexed by feature."""
+        return sum(self.set(column, frame[column]) for column in frame.columns)
+
+    def set_popup(self, columns):
+        """List these columns (besides name and type) in the features' popups."""
+        missing = [c for c in columns if c not in self.frame.columns]
+        if missing:
+            raise KeyError(f"No column(s) {missing} in overlay {self.overlay}")
+        self.popup = list(columns)
+        self._popup_dirty = True
+
+    def take_changes(self):
+        """Pending changes as {"overlay", "columns": {name: {"rows", "values"}}}
+        (plus "popup" if it changed), or None; clears them.  "rows" is null
+        when every feature changed."""
+        if not self._dirty and not self._popup_dirty:
+            return None
+        columns = {}
+        for name, rows in self._dirty.items():
+            values = self.frame[name]
+            if len(rows) == len(self.frame):
+                rows = None
+            else:
+                rows = sorted(rows)
+                values = values.loc[rows]
+            columns[name] = {
+                "rows": rows,
+                "values": json.loads(values.to_json(orient="values", date_format="iso")),
+            }
+        changes = {"overlay": self.overlay, "columns": columns}
+        if self._popup_dirty:
+            changes["popup"] = self.popup
+        self._dirty = {}
+        self._popup_dirty = False
+        return changes
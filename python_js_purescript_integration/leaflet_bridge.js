@@ -15,8 +15,21 @@
  *         label   — dataset name (e.g. "scottish_council_areas")
  *         mapping — {canonical: actualPropertyName} for normalizing events
  *                   canonical keys: name, code, type, parent
+ *         overlay — id chosen by Python (default: the layer's position)
+ *         popup   — optional property names listed in each popup
  *   removeOverlaysRequested()             — remove all previously added overlays
  *   setOverlayStyleRequested(styleJsonStr) — change the default style for new layers
+ *   attributesChanged(changesJsonStr)
+ *       Write feature properties in place, batched per call:
+ *         {"overlays": [{"overlay": id, "popup": [name, ...],
+ *                        "columns": {name: {"rows": [i, ...] | null,
+ *                                           "values": [v, ...]}}}]}
+ *       rows are feature indices (null: every feature, in order).  Tooltips
+ *       and popups of the touched features are redrawn; the layer is not.
+ *
+ * Feature events (click, mouseover, mouseout) carry the overlay id and the
+ * feature's index in the GeoJSON sent, so Python can look the feature up
+ * in its AttributeTable (geodata.py).
  */
 (function () {
     "use strict";
@@ -28,6 +41,7 @@
     helper.textContent = [
         "(function () {",
         "  var layers = [];",
+        "  var overlays = {};  // overlay id → {layer, mapping, popup, features, layers}",
         "  var defaultStyle = {color:'#ff7800', weight:2, fillOpacity:0.2};",
         "",
         "  function getMap() {",
@@ -45,10 +59,50 @@
         "",
         "  function dispatch(type, detail) {",
         "    document.dispatchEvent(",
-        "      new CustomEvent('__map_event__', {detail: Object.assign({type:type}, detail)})",
+        "      new CustomEvent('__map_event__', {detail: Object.assign({}, detail, {type:type})})",
         "    );",
         "  }",
         "",
+        "  function escapeHtml(value) {",
+        "    return String(value).replace(/[&<>\"']/g, function (c) {",
+        "      return {'&':'&amp;', '<':'&lt;', '>':'&gt;', '\"':'&quot;', \"'\":'&#39;'}[c];",
+        "    });",
+        "  }",
+        "",
+        "  // Resolve canonical fields from raw properties using the mapping",
+        "  function resolve(mapping, props) {",
+        "    var out = {};",
+        "    for (var canon in mapping) {",
+        "      var key = mapping[canon];",
+        "      if (key && props[key] != null) out[canon] = props[key];",
+        "    }",
+        "    return out;",
+        "  }",
+        "",
+        "  // (Re)bind tooltip and popup from the feature's current properties",
+        "  function bindContent(entry, feature, lyr) {",
+        "    var props = feature.properties || {};",
+        "    var norm = resolve(entry.mapping, props);",
+        "    var name = norm.name != null ? String(norm.name) : '';",
+        "    var subtitle = norm.type || norm.parent || '';",
+        "    var html = name ? '<strong>' + escapeHtml(name) + '</strong>' : '';",
+        "    if (subtitle) html += (html ? '<br>' : '') + escapeHtml(subtitle);",
+        "    entry.popup.forEach(function (key) {",
+        "      if (props[key] == null) return;",
+        "      html += (html ? '<br>' : '') + escapeHtml(key) + ': ' + escapeHtml(props[key]);",
+        "    });",
+        "    if (html) {",
+        "      if (lyr.getPopup()) lyr.setPopupContent(html); else lyr.bindPopup(html);",
+        "    } else if (lyr.getPopup()) {",
+        "      lyr.unbindPopup();",
+        "    }",
+        "    if (name) {",
+        "      if (lyr.getTooltip()) lyr.setTooltipContent(escapeHtml(name)); else lyr.bindTooltip(escapeHtml(name));",
+        "    } else if (lyr.getTooltip()) {",
+        "      lyr.unbindTooltip();",
+        "    }",
+        "  }",
+        "",
         "  // --- Add overlay -----------------------------------------------",
         "  document.addEventListener('__add_overlay__', function (e) {",
         "    var m = getMap();",
@@ -58,57 +112,96 @@
         "    } catch(err) { dispatch('error', {message:'Invalid GeoJSON: '+err}); return; }",
         "",
         "    var meta = e.detail.metadata || {};",
-        "    var map_ = meta.mapping || {};",
+        "    var id = meta.overlay != null ? meta.overlay : layers.length;",
+        "    var entry = {",
+        "      id: id, mapping: meta.mapping || {}, popup: meta.popup || [],",
+        "      features: [], layers: []",
+        "    };",
         "",
-        "    // Resolve canonical fields from raw properties using the mapping",
-        "    function resolve(props) {",
-        "      var out = {};",
-        "      for (var canon in map_) {",
-        "        var key = map_[canon];",
-        "        if (key && props[key] != null) out[canon] = props[key];",
-        "      }",
-        "      return out;",
-        "    }",
+        "    // Leaflet skips features without geometry, so number them up front",
+        "    var features = data.features || [data];",
+        "    features.forEach(function (f, i) {",
+        "      f._index = i;",
+        "      entry.features[i] = f;",
+        "    });",
         "",
         "    var layer = L.geoJSON(data, {",
         "      style: e.detail.style ? JSON.parse(e.detail.style) : defaultStyle,",
         "      onEachFeature: function (feature, lyr) {",
-        "        var props = feature.properties || {};",
-        "        var norm = resolve(props);",
-        "        var name = norm.name || '';",
-        "        var subtitle = norm.type || norm.parent || '';",
-        "        if (name) {",
-        "          lyr.bindPopup('<strong>' + name + '</strong>' + (subtitle ? '<br>' + subtitle : ''));",
-        "          lyr.bindTooltip(name);",
+        "        var index = feature._index;",
+        "        entry.layers[index] = lyr;",
+        "        bindContent(entry, feature, lyr);",
+        "        // Resolved per event, so edits from Python show up.  The canonical",
+        "        // 'type' goes out as featureType; 'type' names the event.",
+        "        function info(extra) {",
+        "          var norm = resolve(entry.mapping, feature.properties || {});",
+        "          if ('type' in norm) { norm.featureType = norm.type; delete norm.type; }",
+        "          return Object.assign({overlay: id, feature: index}, norm, extra);",
         "        }",
         "        lyr.on('click', function (ev) {",
-        "          dispatch('click', Object.assign({}, norm, {lat:ev.latlng.lat, lng:ev.latlng.lng}));",
+        "          dispatch('click', info({lat:ev.latlng.lat, lng:ev.latlng.lng}));",
         "        });",
         "        lyr.on('mouseover', function () {",
-        "          dispatch('mouseover', norm);",
+        "          dispatch('mouseover', info());",
         "          lyr.setStyle({weight:4, fillOpacity:0.4});",
         "        });",
         "        lyr.on('mouseout', function () {",
-        "          dispatch('mouseout', norm);",
+        "          dispatch('mouseout', info());",
         "          lyr.setStyle(e.detail.style ? JSON.parse(e.detail.style) : defaultStyle);",
         "        });",
         "      }",
         "    }).addTo(m);",
         "",
+        "    entry.layer = layer;",
+        "    overlays[id] = entry;",
         "    layers.push(layer);",
         "    m.fitBounds(layer.getBounds());",
         "    dispatch('overlay_added', {",
         "      label: meta.label || '',",
-        "      featureCount: data.features ? data.features.length : 0,",
+        "      overlay: id,",
+        "      featureCount: features.length,",
         "      layerIndex: layers.length - 1",
         "    });",
         "  });",
         "",
+        "  // --- Write feature attributes ----------------------------------",
+        "  document.addEventListener('__set_attributes__', function (e) {",
+        "    var changes = JSON.parse(e.detail.changes).overlays || [];",
+        "    changes.forEach(function (change) {",
+        "      var entry = overlays[change.overlay];",
+        "      if (!entry) {",
+        "        dispatch('error', {message:'No overlay ' + change.overlay});",
+        "        return;",
+        "      }",
+        "      var touched = new Set();",
+        "      var all = !!change.popup;",
+        "      if (change.popup) entry.popup = change.popup;",
+        "      var columns = change.columns || {};",
+        "      for (var key in columns) {",
+        "        var rows = columns[key].rows, values = columns[key].values;",
+        "        for (var k = 0; k < values.length; k++) {",
+        "          var i = rows ? rows[k] : k;",
+        "          var f = entry.features[i];",
+        "          if (!f) continue;",
+        "          (f.properties = f.properties || {})[key] = values[k];",
+        "          touched.add(i);",
+        "        }",
+        "        if (!rows) all = true;",
+        "      }",
+        "      var redraw = all ? entry.layers.map(function (_, i) { return i; }) : Array.from(touched);",
+        "      redraw.forEach(function (i) {",
+        "        if (entry.layers[i]) bindContent(entry, entry.features[i], entry.layers[i]);",
+        "      });",
+        "      dispatch('attributes_updated', {overlay: change.overlay, featureCount: touched.size});",
+        "    });",
+        "  });",
+        "",
         "  // --- Remove overlays -------------------------------------------",
         "  document.addEventListener('__remove_overlays__', function () {",
         "    var m = getMap();",
         "    layers.forEach(function (l) { if (m) m.removeLayer(l); });",
         "    layers = [];",
+        "    overlays = {};",
         "    dispatch('overlays_removed', {});",
         "  });",
         "",
@@ -159,6 +252,13 @@
             );
         });
 
+        // Passed on as a string: MainWorld parses it (cf. __add_overlay__)
+        backend.attributesChanged.connect(function (changesJsonStr) {
+            document.dispatchEvent(
+                new CustomEvent("__set_attributes__", { detail: { changes: changesJsonStr } })
+            );
+        });
+
         backend.log("Leaflet bridge ready — emit addOverlayRequested to add layers");
     });
 })();
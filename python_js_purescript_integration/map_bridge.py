@@ -12,7 +12,17 @@ Example — Leaflet map with GeoJSON overlay driven from Python:
 
 Once running, type a GeoJSON or Shapefile path at the prompt to push
 an overlay onto the map.  Map events (click, mouseover) are logged
-back to the terminal.
+back to the terminal, with the overlay id and feature index.
+
+Each overlay's attributes are kept in Python as an AttributeTable
+(geodata.py), so they can be read and changed in bulk; changes reach the
+map in one attributesChanged message and update tooltips and popups in
+place.  JSON commands at the prompt:
+    {"command": "columns", "overlay": 0}
+    {"command": "get", "overlay": 0, "columns": ["NAME_1"], "rows": [0, 1]}
+    {"command": "set", "overlay": 0, "column": "NAME_1", "values": ["Carlow", "Cavan"], "rows": [0, 1]}
+    {"command": "set", "overlay": 0, "column": "status", "value": "checked"}
+    {"command": "popup", "overlay": 0, "columns": ["status"]}
 """
 
 import argparse
@@ -20,29 +30,17 @@ import json
 import os
 import sys
 import threading
-from datetime import datetime
 from pathlib import Path
 
 from PySide6.QtCore import QFile, QIODeviceBase, QObject, QUrl, Signal, Slot
 from PySide6.QtWidgets import QApplication
 from PySide6.QtWebChannel import QWebChannel
-from PySide6.QtWebEngineCore import QWebEnginePage, QWebEngineScript, QWebEngineSettings
+from PySide6.QtWebEngineCore import QWebEngineScript, QWebEngineSettings
 from PySide6.QtWebEngineWidgets import QWebEngineView
 
-from geodata import build_metadata, load_geo_file
-
-
-# ---------------------------------------------------------------------------
-# ConsolePage — JS console.log/warn/error → Python stdout
-# ---------------------------------------------------------------------------
-class ConsolePage(QWebEnginePage):
-    def javaScriptConsoleMessage(self, level, message, line, source):
-        level_str = {
-            QWebEnginePage.JavaScriptConsoleMessageLevel.InfoMessageLevel: "INFO",
-            QWebEnginePage.JavaScriptConsoleMessageLevel.WarningMessageLevel: "WARN",
-            QWebEnginePage.JavaScriptConsoleMessageLevel.ErrorMessageLevel: "ERROR",
-        }.get(level, "DEBUG")
-        print(f"  [JS {level_str}] {source}:{line}: {message}", flush=True)
+import event_log
+from event_log import ConsolePage
+from geodata import AttributeTable, build_metadata, load_geo_frame
 
 
 # ---------------------------------------------------------------------------
@@ -53,48 +51,81 @@ class Backend(QObject):
     addOverlayRequested = Signal(str, str)
     removeOverlaysRequested = Signal()
     setOverlayStyleRequested = Signal(str)
+    # {"overlays": [AttributeTable.take_changes(), ...]}
+    attributesChanged = Signal(str)
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.ready = False
+        self.tables = {}  # overlay id → AttributeTable
+        self._next_overlay = 0
 
     @Slot(str)
     def log(self, message):
-        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        print(f"  [bridge {ts}] {message}", flush=True)
+        event_log.get_log().info("bridge", message)
         if "ready" in message.lower():
             self.ready = True
 
     @Slot(str)
     def onMapEvent(self, event_json):
-        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        log = event_log.get_log()
         try:
             evt = json.loads(event_json)
         except json.JSONDecodeError:
-            print(f"  [MAP {ts}] {event_json}", flush=True)
+            log.info("MAP", event_json)
             return
 
         etype = evt.get("type", "?")
+        if etype == "error":
+            log.error("MAP", "%s", evt.get("message", event_json))
+            return
+        # Hover events are the bulk of the traffic; skip labelling them when
+        # INFO records would be discarded anyway
+        if not log.enabled(event_log.INFO, "MAP"):
+            return
         name = evt.get("name", "")
         code = evt.get("code", "")
         label = f"{name} [{code}]" if code else name
+        if "feature" in evt:
+            label = f"{label} (#{evt['overlay']}:{evt['feature']})"
 
         if etype == "click":
             lat, lng = evt.get("lat", "?"), evt.get("lng", "?")
             if isinstance(lat, float):
                 lat, lng = f"{lat:.4f}", f"{lng:.4f}"
-            print(f"  [MAP {ts}] click: {label} at {lat}, {lng}", flush=True)
+            log.info("MAP", "click: %s at %s, %s", label, lat, lng)
         elif etype in ("mouseover", "mouseout"):
-            print(f"  [MAP {ts}] {etype}: {label}", flush=True)
+            log.info("MAP", "%s: %s", etype, label)
         elif etype == "overlay_added":
             n = evt.get("featureCount", "?")
             ds = evt.get("label", "")
             desc = f"{ds} ({n} features)" if ds else f"{n} features"
-            print(f"  [MAP {ts}] overlay added: {desc}", flush=True)
-        elif etype == "error":
-            print(f"  [MAP {ts}] ERROR: {evt.get('message', event_json)}", flush=True)
+            log.info("MAP", "overlay %s added: %s", evt.get("overlay", "?"), desc)
         else:
-            print(f"  [MAP {ts}] {etype}: {event_json}", flush=True)
+            log.info("MAP", "%s: %s", etype, event_json)
+
+    def add_overlay(self, path):
+        """Load a geo file, keep its attribute table and draw it on the map."""
+        gdf = load_geo_frame(path)
+        geojson_str = gdf.to_json()
+        metadata = build_metadata(geojson_str, path)
+        metadata["overlay"] = overlay = self._next_overlay
+        self._next_overlay += 1
+        self.tables[overlay] = AttributeTable(overlay, gdf.drop(columns=gdf.geometry.name))
+        self.addOverlayRequested.emit(geojson_str, json.dumps(metadata))
+        return metadata
+
+    def remove_overlays(self):
+        self.tables.clear()
+        self.removeOverlaysRequested.emit()
+
+    def flush_attributes(self):
+        """Send every table's pending changes to the map in one message.
+        Returns the number of overlays that had changes."""
+        changes = [c for c in (t.take_changes() for t in self.tables.values()) if c]
+        if changes:
+            self.attributesChanged.emit(json.dumps({"overlays": changes}))
+        return len(changes)
 
 
 # ---------------------------------------------------------------------------
@@ -110,11 +141,36 @@ def read_qwebchannel_js():
     return content
 
 
+def handle_command(backend, cmd):
+    """Run one attribute command typed at the prompt."""
+    command = cmd.get("command")
+    table = backend.tables.get(cmd.get("overlay"))
+    if table is None:
+        print(f"  No overlay {cmd.get('overlay')}; have {list(backend.tables)}", flush=True)
+        return
+    if command == "columns":
+        print(f"  #{table.overlay}: {len(table)} features {table.columns}", flush=True)
+    elif command == "get":
+        df = table.get(cmd.get("columns"), cmd.get("rows"))
+        print(df.head(20).to_string(), flush=True)
+    elif command == "set":
+        values = cmd["values"] if "values" in cmd else cmd.get("value")
+        n = table.set(cmd["column"], values, cmd.get("rows"))
+        backend.flush_attributes()
+        print(f"  {n} value(s) changed", flush=True)
+    elif command == "popup":
+        table.set_popup(cmd.get("columns", []))
+        backend.flush_attributes()
+    else:
+        print(f"  Unknown command: {command}", flush=True)
+
+
 def stdin_loop(backend, app):
-    """Background thread: read file paths from stdin, load and send via signal."""
+    """Background thread: read file paths (loaded and sent via signal) or
+    JSON attribute commands from stdin."""
     while True:
         try:
-            line = input("\n> Enter GeoJSON/Shapefile path: ").strip()
+            line = input("\n> Enter GeoJSON/Shapefile path or JSON command: ").strip()
         except EOFError:
             print("\n  EOF — quitting.", flush=True)
             app.quit()
@@ -122,10 +178,11 @@ def stdin_loop(backend, app):
         if not line:
             continue
         try:
-            geojson_str = load_geo_file(line)
-            metadata = build_metadata(geojson_str, line)
+            if line.startswith("{"):
+                handle_command(backend, json.loads(line))
+                continue
+            metadata = backend.add_overlay(line)
             print(f"  Metadata: {json.dumps(metadata)}", flush=True)
-            backend.addOverlayRequested.emit(geojson_str, json.dumps(metadata))
             print(f"  Injected: {line}", flush=True)
         except Exception as e:
             print(f"  Error: {e}", flush=True)
@@ -140,6 +197,7 @@ def main():
     )
     parser.add_argument("page_url", help="URL or file path of the web page to display")
     parser.add_argument("extension_js", help="Path to the JS file to inject into UserWorld")
+    event_log.add_arguments(parser)
     args = parser.parse_args()
 
     # Resolve page URL
@@ -155,6 +213,7 @@ def main():
         sys.exit(1)
     extension_js = ext_js_path.read_text(encoding="utf-8")
 
+    event_log.configure_from_args(args)
     app = QApplication(sys.argv)
 
     # --- Page & view -----------------------------------------------------
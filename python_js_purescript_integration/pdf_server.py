@@ -0,0 +1,206 @@
+"""Serve local PDF files to Qt WebEngine over HTTP with Range support.
+
+PDF.js and Chromium's PDF plugin only load a document progressively when
+the server answers byte-range requests (206 Partial Content); file:// URLs
+and the File API always hand over the whole file.  PdfByteServer is a tiny
+stand-in server on 127.0.0.1 that memory-maps each registered file and
+serves slices of it, so the first page of a gigabyte-scale scan can be
+shown after fetching a few chunks.
+
+Only files that were explicitly registered with add() are reachable, each
+under an unguessable token.  CORS headers are set so a file:// page (such
+as js_pdf_annotations/pdf-viewer.html) can fetch from the server.
+
+Usage:
+    server = PdfByteServer()
+    server.start()
+    url = server.add("/path/to/scan.pdf")   # http://127.0.0.1:<port>/<token>/scan.pdf
+    ...
+    server.close()
+"""
+
+import mmap
+import re
+import secrets
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Bytes written per socket send when streaming a range out of the mmap
+_WRITE_CHUNK = 1 << 20
+
+
+def parse_range(header, size):
+    """Parse a single-range ``Range`` header against a file of ``size`` bytes.
+
+    Returns (start, end) with ``end`` exclusive, None if the header is absent
+    or not something we handle (the caller then serves the whole file), or
+    raises ValueError if the range is unsatisfiable.
+    """
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m:
+        # Multiple ranges or another unit: ignoring Range is allowed by RFC 9110
+        return None
+    first, last = m.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        if size == 0:
+            raise ValueError(f"range {header!r} not satisfiable for an empty file")
+        return max(0, size - length), size
+    start = int(first)
+    if last != "" and int(last) < start:
+        # last < first is syntactically invalid, so it is ignored, not refused
+        return None
+    end = size if last == "" else min(int(last) + 1, size)
+    if start >= size or start >= end:
+        raise ValueError(f"range {header!r} not satisfiable for {size} bytes")
+    return start, end
+
+
+class _MappedFile:
+    """A read-only memory map of one registered file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.name = self.path.name
+        self._file = self.path.open("rb")
+        self.size = self.path.stat().st_size
+        # mmap refuses zero-length files
+        self.data = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.size
+            else b""
+        )
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "PdfByteServer/0.1"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _cors_headers(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Headers", "Range")
+        self.send_header(
+            "Access-Control-Expose-Headers",
+            "Accept-Ranges, Content-Range, Content-Length, Content-Encoding",
+        )
+
+    def _lookup(self):
+        token = self.path.lstrip("/").split("/", 1)[0]
+        return self.server.files.get(token)
+
+    def do_OPTIONS(self):
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self._cors_headers()
+        self.send_header("Access-Control-Allow-Methods", "GET, HEAD, OPTIONS")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        mapped = self._lookup()
+        if mapped is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        try:
+            byte_range = parse_range(self.headers.get("Range"), mapped.size)
+        except ValueError:
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self._cors_headers()
+            self.send_header("Content-Range", f"bytes */{mapped.size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if byte_range is None:
+            start, end = 0, mapped.size
+            self.send_response(HTTPStatus.OK)
+        else:
+            start, end = byte_range
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{mapped.size}")
+
+        self._cors_headers()
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start))
+        self.end_headers()
+
+        if not send_body:
+            return
+        view = memoryview(mapped.data)
+        try:
+            for offset in range(start, end, _WRITE_CHUNK):
+                self.wfile.write(view[offset : min(offset + _WRITE_CHUNK, end)])
+        except (BrokenPipeError, ConnectionResetError):
+            # PDF.js aborts the initial full GET once it knows ranges work
+            pass
+        finally:
+            view.release()
+
+
+class PdfByteServer:
+    """Local HTTP server for registered PDF files, with Range support."""
+
+    def __init__(self, host="127.0.0.1", port=0, verbose=False):
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.files = {}
+        self._httpd.verbose = verbose
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests on a background daemon thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="pdf-byte-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def add(self, path):
+        """Register a file and return the URL it is served under."""
+        mapped = _MappedFile(Path(path).expanduser().resolve())
+        token = secrets.token_urlsafe(12)
+        with self._lock:
+            self._httpd.files[token] = mapped
+        return f"{self.base_url}/{token}/{quote(mapped.name)}"
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        with self._lock:
+            for mapped in self._httpd.files.values():
+                mapped.close()
+            self._httpd.files.clear()
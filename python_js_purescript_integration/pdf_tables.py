@@ -0,0 +1,343 @@
+"""Find tables in a PDF that have the same shape as a spreadsheet table.
+
+Every page is scanned for candidate tables (pdfplumber), in parallel
+across processes.  Each table gets a column-type signature such as
+``date|currency|currency|number``, and the index maps signature →
+tables so that a query for a spreadsheet range's signature is a
+dictionary lookup instead of a re-scan of the PDF.  Optionally the query
+also carries the range's contents, and matches are ranked by how many
+cell values they share.
+
+The index is saved next to the document (``<name>.pdf.tables.json``) and
+reused until the PDF's size or modification time changes.
+
+Usage:
+    python pdf_tables.py <pdf_file> <signature> [--rebuild] [--workers N]
+
+Example:
+    uv run python python_js_purescript_integration/pdf_tables.py \
+        statement.pdf "date,currency,currency,number"
+
+Requires the ``pdf-tables`` extra (pdfplumber):
+    uv sync --extra pdf-tables
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+INDEX_VERSION = 1
+
+# ---------------------------------------------------------------------------
+# Cell and column typing
+# ---------------------------------------------------------------------------
+CELL_TYPES = ("date", "currency", "percent", "number", "text", "empty")
+
+_NUMBER = r"\(?[+-]?(?:\d{1,3}(?:[,\s]\d{3})+|\d+)(?:\.\d+)?\)?"
+_NUMBER_RE = re.compile(rf"^{_NUMBER}$")
+_PERCENT_RE = re.compile(rf"^{_NUMBER}\s*%$")
+_CURRENCY_RE = re.compile(
+    rf"^(?:[$€£¥]|USD|EUR|GBP|JPY|CHF|CAD|AUD)\s*{_NUMBER}$"
+    rf"|^{_NUMBER}\s*(?:[$€£¥]|USD|EUR|GBP|JPY|CHF|CAD|AUD)$"
+    rf"|^[+-]?[$€£¥]\s*{_NUMBER}$"
+)
+_MONTH = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?"
+_DATE_RE = re.compile(
+    r"^\d{4}-\d{1,2}-\d{1,2}$"
+    r"|^\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}$"
+    rf"|^\d{{1,2}}[ -]{_MONTH}[ ,-]*\d{{2,4}}$"
+    rf"|^{_MONTH} \d{{1,2}},? \d{{4}}$",
+    re.IGNORECASE,
+)
+
+
+def cell_type(value):
+    """Classify one cell as date, currency, percent, number, text or empty.
+
+    Accepts strings from PDF extraction as well as the Python values a
+    spreadsheet range yields (datetime, int, float, None).
+
+    >>> [cell_type(s) for s in ("10-Jan-2024", "10 Jan, 2024", "Jan 10, 2024")]
+    ['date', 'date', 'date']
+    >>> [cell_type(s) for s in ("$1,234.50", "12.5%", "(1,001)", "n/a", "")]
+    ['currency', 'percent', 'number', 'text', 'empty']
+    """
+    if value is None:
+        return "empty"
+    if isinstance(value, (dt.date, dt.datetime)):
+        return "date"
+    if isinstance(value, bool):
+        return "text"
+    if isinstance(value, (int, float)):
+        return "number"
+    s = " ".join(str(value).split())
+    if not s:
+        return "empty"
+    if _DATE_RE.match(s):
+        return "date"
+    if _CURRENCY_RE.match(s):
+        return "currency"
+    if _PERCENT_RE.match(s):
+        return "percent"
+    if _NUMBER_RE.match(s):
+        return "number"
+    return "text"
+
+
+def split_header(rows):
+    """Split off a header row: a first row of all-text cells sitting above
+    at least one column whose body is not text."""
+    if len(rows) < 2:
+        return None, rows
+    head, body = rows[0], rows[1:]
+    if all(cell_type(c) in ("text", "empty") for c in head):
+        body_types = column_types(body)
+        if any(t not in ("text", "empty") for t in body_types):
+            return head, body
+    return None, rows
+
+
+def column_types(rows):
+    """Most common non-empty cell type per column ("empty" if none)."""
+    width = max((len(r) for r in rows), default=0)
+    types = []
+    for col in range(width):
+        counts = Counter(
+            cell_type(r[col]) for r in rows if col < len(r)
+        )
+        counts.pop("empty", None)
+        types.append(counts.most_common(1)[0][0] if counts else "empty")
+    return types
+
+
+def signature_key(types):
+    """Canonical string form of a signature, e.g. 'date|currency|number'."""
+    return "|".join(types)
+
+
+def parse_signature(text):
+    """Parse 'date, currency, number' (or '|'-separated) into a type list."""
+    types = [t.strip().lower() for t in re.split(r"[,|]", text) if t.strip()]
+    unknown = [t for t in types if t not in CELL_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown column type(s) {unknown}; expected {CELL_TYPES}")
+    return types
+
+
+def range_signature(rows):
+    """Signature of a spreadsheet range (list of row lists), header skipped."""
+    _, body = split_header(rows)
+    return column_types(body)
+
+
+# ---------------------------------------------------------------------------
+# Extraction (runs in worker processes)
+# ---------------------------------------------------------------------------
+def _extract_pages(pdf_path, page_numbers):
+    """Find tables on the given 1-based pages.  Opens the PDF once per chunk."""
+    import pdfplumber
+
+    found = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for num in page_numbers:
+            page = pdf.pages[num - 1]
+            for table in page.find_tables():
+                rows = [[c if c is not None else "" for c in row] for row in table.extract()]
+                rows = [r for r in rows if any(str(c).strip() for c in r)]
+                if len(rows) < 2:
+                    continue
+                header, body = split_header(rows)
+                found.append(dict(
+                    page=num,
+                    # pdfplumber bbox is (x0, top, x1, bottom) in PDF points,
+                    # origin top-left — the viewer's page coordinates
+                    bbox=[round(v, 2) for v in table.bbox],
+                    signature=signature_key(column_types(body)),
+                    header=header,
+                    rows=body,
+                ))
+    return found
+
+
+def _page_count(pdf_path):
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def _fingerprint(pdf_path):
+    st = os.stat(pdf_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _normalise(value):
+    return " ".join(str(value).split()).lower()
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+class TableIndex:
+    """Signature → tables index for one PDF, persisted next to the document."""
+
+    def __init__(self, pdf_path, tables, fingerprint):
+        self.pdf_path = Path(pdf_path)
+        self.tables = tables
+        self.fingerprint = fingerprint
+        self.by_signature = {}
+        for i, t in enumerate(tables):
+            self.by_signature.setdefault(t["signature"], []).append(i)
+
+    @staticmethod
+    def index_path(pdf_path):
+        pdf_path = Path(pdf_path)
+        return pdf_path.with_name(pdf_path.name + ".tables.json")
+
+    @classmethod
+    def build(cls, pdf_path, workers=None, chunk_size=8):
+        """Extract tables from every page using a process pool."""
+        pdf_path = Path(pdf_path).resolve()
+        n_pages = _page_count(str(pdf_path))
+        chunks = [
+            list(range(start, min(start + chunk_size, n_pages + 1)))
+            for start in range(1, n_pages + 1, chunk_size)
+        ]
+        tables = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() yields in submission order, so tables stay in page order
+            for found in pool.map(_extract_pages, [str(pdf_path)] * len(chunks), chunks):
+                tables.extend(found)
+        return cls(pdf_path, tables, _fingerprint(pdf_path))
+
+    @classmethod
+    def load(cls, pdf_path):
+        """Load the saved index, or None if missing or stale."""
+        pdf_path = Path(pdf_path).resolve()
+        path = cls.index_path(pdf_path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if data.get("version") != INDEX_VERSION or data.get("fingerprint") != _fingerprint(pdf_path):
+            return None
+        return cls(pdf_path, data["tables"], data["fingerprint"])
+
+    @classmethod
+    def load_or_build(cls, pdf_path, rebuild=False, workers=None):
+        index = None if rebuild else cls.load(pdf_path)
+        if index is None:
+            index = cls.build(pdf_path, workers=workers)
+            index.save()
+        return index
+
+    def save(self):
+        path = self.index_path(self.pdf_path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({
+                "version": INDEX_VERSION,
+                "fingerprint": self.fingerprint,
+                "tables": self.tables,
+            }),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+
+    def query(self, signature, contents=None, similar=False, limit=10):
+        """Tables matching a column-type signature, best first.
+
+        signature: list of types (see CELL_TYPES) or a string for parse_signature.
+        contents:  optional rows from the spreadsheet range; matches are then
+                   ranked by the share of the range's distinct cell values
+                   that also occur in the table.
+        similar:   also return tables whose signature has the same width and
+                   differs in some columns, scored by the share that agree.
+
+        Returns a list of (score, table) with score in 0..1.
+        """
+        if isinstance(signature, str):
+            signature = parse_signature(signature)
+        key = signature_key(signature)
+
+        candidates = [(1.0, i) for i in self.by_signature.get(key, [])]
+        if similar:
+            for other, ids in self.by_signature.items():
+                other_types = other.split("|")
+                if other == key or len(other_types) != len(signature):
+                    continue
+                agree = sum(a == b for a, b in zip(signature, other_types)) / len(signature)
+                if agree >= 0.5:
+                    candidates.extend((agree, i) for i in ids)
+
+        if contents:
+            wanted = {_normalise(c) for row in contents for c in row if _normalise(c)}
+            if wanted:
+                rescored = []
+                for shape_score, i in candidates:
+                    have = {_normalise(c) for row in self.tables[i]["rows"] for c in row}
+                    overlap = len(wanted & have) / len(wanted)
+                    rescored.append(((shape_score + overlap) / 2, i))
+                candidates = rescored
+
+        candidates.sort(key=lambda c: (-c[0], self.tables[c[1]]["page"]))
+        return [(score, self.tables[i]) for score, i in candidates[:limit]]
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find PDF tables whose column types match a signature."
+    )
+    parser.add_argument("pdf_file", help="PDF to search")
+    parser.add_argument(
+        "signature",
+        help=f"Comma-separated column types, from {', '.join(CELL_TYPES)}",
+    )
+    parser.add_argument("--similar", action="store_true",
+                        help="Also return tables that match most columns")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Ignore the saved index and re-scan the PDF")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Extraction processes (default: CPU count)")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    pdf_path = Path(args.pdf_file).expanduser().resolve()
+    if not pdf_path.exists():
+        print(f"PDF not found: {pdf_path}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        signature = parse_signature(args.signature)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    index = TableIndex.load_or_build(pdf_path, rebuild=args.rebuild, workers=args.workers)
+    t1 = time.perf_counter()
+    matches = index.query(signature, similar=args.similar, limit=args.limit)
+    t2 = time.perf_counter()
+
+    print(
+        f"{len(index.tables)} tables, {len(index.by_signature)} signatures "
+        f"(index {t1 - t0:.2f}s, query {(t2 - t1) * 1000:.2f}ms)"
+    )
+    for score, table in matches:
+        bbox = ", ".join(f"{v:.1f}" for v in table["bbox"])
+        print(f"  {score:.2f}  page {table['page']:<4} [{bbox}]  {table['signature']}")
+        for row in table["rows"][:3]:
+            print(f"        {row}")
+
+
+if __name__ == "__main__":
+    main()
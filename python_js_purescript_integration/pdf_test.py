@@ -2,6 +2,8 @@ import sys
 from PySide6 import QtCore, QtWidgets, QtWebEngineWidgets
 from PySide6.QtWebEngineCore import QWebEngineSettings
 
+from pdf_server import PdfByteServer
+
 
 def main():
 
@@ -15,11 +17,16 @@ def main():
     view = QtWebEngineWidgets.QWebEngineView()
     settings = view.settings()
     settings.setAttribute(QWebEngineSettings.PluginsEnabled, True)
-    url = QtCore.QUrl.fromLocalFile(filename)
+    # Serve the file over local HTTP with Range support rather than file://
+    # so Chromium's PDF plugin can load large documents progressively.
+    server = PdfByteServer().start()
+    url = QtCore.QUrl(server.add(filename))
     view.load(url)
     view.resize(640, 480)
     view.show()
-    sys.exit(app.exec())
+    status = app.exec()
+    server.close()
+    sys.exit(status)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,333 @@
+/**
+ * table_bridge.js — HTML table extraction, injected into UserWorld
+ *
+ * Serialises every <table> on the page column by column:
+ *
+ *   { id, index, caption, headerRows, header: [name, ...],
+ *     columns: [[cell, ...], ...], rows, width }
+ *
+ * `columns[j][i]` is the text of body row i, column j on the table's grid,
+ * with colspan/rowspan cells repeated into every slot they cover.  Header
+ * rows (in <thead>, or leading rows of only <th>) become `header`.
+ *
+ * Each table is read in one pass over table.rows/row.cells and the result
+ * is cached per table.  A MutationObserver marks the tables that changed;
+ * only those are read again, and once the bridge is up the changes are
+ * pushed to Python by themselves (incremental payloads carry just the
+ * changed tables plus the ids of removed ones).
+ *
+ * Writing back: Python sends only the cells that differ,
+ *   {"table": 3, "cells": [[row, col, text], ...]}
+ * in body coordinates (row -1 is the last header row).  A column one past
+ * the current width is appended to every row that gets a value, which is
+ * how spreadsheet columns are added to a page table.
+ *
+ * Standalone use (any world):   tableBridge.extract({incremental: false})
+ * Bridge use (QWebChannel):     backend.extractRequested → backend.onTables
+ *                               backend.cellsRequested   → cells written
+ */
+(function () {
+    "use strict";
+
+    var PUSH_DELAY_MS = 250;
+    var MAX_SPAN = 1000;
+
+    var ids = new WeakMap();     // table → id
+    var cache = new WeakMap();   // table → { data, grid }
+    var dirty = new Set();       // tables changed since they were last sent
+    var reported = new Map();    // id → table, as of the last payload
+    var nextId = 1;
+
+    function tableId(table) {
+        var id = ids.get(table);
+        if (id === undefined) {
+            id = nextId++;
+            ids.set(table, id);
+        }
+        return id;
+    }
+
+    function cellText(cell) {
+        return (cell.textContent || "").replace(/\s+/g, " ").trim();
+    }
+
+    function isHeaderRow(row) {
+        if (row.parentNode && row.parentNode.nodeName === "THEAD") return true;
+        if (row.cells.length === 0) return false;
+        for (var i = 0; i < row.cells.length; i++) {
+            if (row.cells[i].nodeName !== "TH") return false;
+        }
+        return true;
+    }
+
+    // grid[r][c] = cell element covering that slot (spans expanded)
+    function buildGrid(table) {
+        var rows = table.rows;
+        var grid = [];
+        var spanLeft = [];
+        var spanCell = [];
+        for (var r = 0; r < rows.length; r++) {
+            var line = [];
+            var c = 0;
+            var cells = rows[r].cells;
+            for (var k = 0; k < cells.length; k++) {
+                while (spanLeft[c] > 0) {
+                    line[c] = spanCell[c];
+                    spanLeft[c]--;
+                    c++;
+                }
+                var cell = cells[k];
+                var cs = Math.min(Math.max(cell.colSpan | 0, 1), MAX_SPAN);
+                var rs = Math.min(Math.max(cell.rowSpan | 0, 1), MAX_SPAN);
+                for (var j = 0; j < cs; j++, c++) {
+                    line[c] = cell;
+                    if (rs > 1) {
+                        spanLeft[c] = rs - 1;
+                        spanCell[c] = cell;
+                    }
+                }
+            }
+            for (; c < spanLeft.length; c++) {
+                if (spanLeft[c] > 0) {
+                    line[c] = spanCell[c];
+                    spanLeft[c]--;
+                }
+            }
+            grid.push(line);
+        }
+        return grid;
+    }
+
+    function readTable(table, index) {
+        var grid = buildGrid(table);
+        var headerRows = 0;
+        while (headerRows < grid.length && isHeaderRow(table.rows[headerRows])) {
+            headerRows++;
+        }
+        var width = 0;
+        for (var r = 0; r < grid.length; r++) width = Math.max(width, grid[r].length);
+
+        // Spanned cells occupy several slots; read each element's text once
+        var texts = new Map();
+        function text(cell) {
+            if (!cell) return "";
+            var t = texts.get(cell);
+            if (t === undefined) {
+                t = cellText(cell);
+                texts.set(cell, t);
+            }
+            return t;
+        }
+
+        var header = [];
+        for (var c = 0; c < width; c++) {
+            var parts = [];
+            for (var h = 0; h < headerRows; h++) {
+                var t = text(grid[h][c]);
+                if (t && parts[parts.length - 1] !== t) parts.push(t);
+            }
+            header.push(parts.join(" / "));
+        }
+        var columns = [];
+        for (c = 0; c < width; c++) {
+            var col = new Array(grid.length - headerRows);
+            for (r = headerRows; r < grid.length; r++) col[r - headerRows] = text(grid[r][c]);
+            columns.push(col);
+        }
+        return {
+            grid: grid,
+            data: {
+                id: tableId(table),
+                index: index,
+                caption: table.caption ? cellText(table.caption) : "",
+                headerRows: headerRows,
+                header: header,
+                columns: columns,
+                rows: grid.length - headerRows,
+                width: width,
+            },
+        };
+    }
+
+    /**
+     * Read the page's tables.
+     * opts.incremental: only include tables that changed since the last
+     * payload; `removed` lists ids of tables that are gone.
+     */
+    function extract(opts) {
+        opts = opts || {};
+        var t0 = performance.now();
+        markDirty(observer.takeRecords());
+
+        var tables = document.getElementsByTagName("table");
+        var out = [];
+        var seen = new Map();
+        var read = 0;
+        for (var i = 0; i < tables.length; i++) {
+            var table = tables[i];
+            var entry = cache.get(table);
+            var changed = !entry || dirty.has(table);
+            if (changed) {
+                entry = readTable(table, i);
+                cache.set(table, entry);
+                read++;
+            }
+            entry.data.index = i;
+            seen.set(entry.data.id, table);
+            if (changed || !opts.incremental || !reported.has(entry.data.id)) {
+                out.push(entry.data);
+            }
+        }
+        var removed = [];
+        reported.forEach(function (_, id) {
+            if (!seen.has(id)) removed.push(id);
+        });
+        reported = seen;
+        dirty.clear();
+
+        return {
+            incremental: !!opts.incremental,
+            tables: out,
+            removed: removed,
+            total: tables.length,
+            read: read,
+            elapsedMs: Math.round((performance.now() - t0) * 100) / 100,
+        };
+    }
+
+    function tableById(id) {
+        var table = reported.get(id);
+        return table && table.isConnected ? table : null;
+    }
+
+    /**
+     * Write {"table", "cells": [[row, col, text], ...]}; rows are body rows,
+     * -1 is the last header row.  Returns the number of cells written.
+     */
+    function writeCells(request) {
+        var table = tableById(request.table);
+        if (!table) return 0;
+        markDirty(observer.takeRecords());
+        var entry = cache.get(table);
+        if (!entry || dirty.has(table)) {
+            entry = readTable(table, entry ? entry.data.index : 0);
+            cache.set(table, entry);
+        }
+        var grid = entry.grid;
+        var data = entry.data;
+        var written = 0;
+        (request.cells || []).forEach(function (cell) {
+            var r = data.headerRows + cell[0];
+            var c = cell[1];
+            if (r < 0 || r >= grid.length || c < 0 || c > data.width) return;
+            if (c === data.width) {
+                // New column: a header slot and an empty body column
+                data.header.push("");
+                data.columns.push(new Array(data.rows).fill(""));
+                data.width++;
+            }
+            var el = grid[r][c];
+            if (!el) {
+                el = document.createElement(r < data.headerRows ? "th" : "td");
+                table.rows[r].appendChild(el);
+                grid[r][c] = el;
+            }
+            var value = cell[2] === null || cell[2] === undefined ? "" : String(cell[2]);
+            el.textContent = value;
+            if (el.colSpan > 1 || el.rowSpan > 1) {
+                // Covers other slots too; re-read the table next time
+                dirty.add(table);
+            } else if (r < data.headerRows) {
+                data.header[c] = value;
+            } else {
+                data.columns[c][r - data.headerRows] = value;
+            }
+            written++;
+        });
+        // Python already knows these values; don't push them back
+        observer.takeRecords();
+        return written;
+    }
+
+    // --- Change tracking ----------------------------------------------------
+    var onChange = null;
+    var pushTimer = null;
+
+    function markDirty(mutations) {
+        for (var i = 0; i < mutations.length; i++) {
+            var node = mutations[i].target;
+            var el = node.nodeType === Node.ELEMENT_NODE ? node : node.parentElement;
+            // An edit inside a nested table changes its ancestors' text too
+            var table = el && el.closest("table");
+            while (table) {
+                dirty.add(table);
+                table = table.parentElement && table.parentElement.closest("table");
+            }
+            // Added or removed tables show up as a change in the table count
+            if (mutations[i].type === "childList") dirty.add(document);
+        }
+    }
+
+    var observer = new MutationObserver(function (mutations) {
+        markDirty(mutations);
+        if (onChange && dirty.size && pushTimer === null) {
+            pushTimer = setTimeout(function () {
+                pushTimer = null;
+                onChange();
+            }, PUSH_DELAY_MS);
+        }
+    });
+    observer.observe(document.documentElement, {
+        childList: true,
+        characterData: true,
+        attributes: true,
+        attributeFilter: ["colspan", "rowspan"],
+        subtree: true,
+    });
+
+    window.tableBridge = { extract: extract, writeCells: writeCells };
+
+    // Bridge to Python when loaded into a world with a QWebChannel transport
+    if (typeof QWebChannel === "undefined" || typeof qt === "undefined") return;
+
+    new QWebChannel(qt.webChannelTransport, function (channel) {
+        var backend = channel.objects.backend;
+
+        function send(opts) {
+            var payload = extract(opts);
+            if (payload.incremental && !payload.tables.length && !payload.removed.length) return;
+            backend.onTables(JSON.stringify(payload));
+        }
+
+        // Request: {"incremental": false}
+        backend.extractRequested.connect(function (jsonStr) {
+            var request = {};
+            try {
+                request = JSON.parse(jsonStr || "{}");
+            } catch (err) {
+                backend.log("Failed to parse extract request: " + err);
+                return;
+            }
+            send({ incremental: !!request.incremental });
+        });
+
+        backend.cellsRequested.connect(function (jsonStr) {
+            var request;
+            try {
+                request = JSON.parse(jsonStr);
+            } catch (err) {
+                backend.log("Failed to parse cell update: " + err);
+                return;
+            }
+            var n = writeCells(request);
+            backend.log("Wrote " + n + " cell(s) to table " + request.table);
+        });
+
+        onChange = function () {
+            send({ incremental: true });
+        };
+
+        backend.log("Table bridge ready");
+        send({ incremental: false });
+    });
+})();
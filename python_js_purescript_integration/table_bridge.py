@@ -0,0 +1,425 @@
+"""
+Load a web page, pull every HTML table into pandas, and join/diff the tables
+against a spreadsheet range.
+
+table_bridge.js is injected into UserWorld (like web_monitor.py's observer).
+It sends each table column by column, and then only the tables that a
+MutationObserver saw change.  Python keeps one DataFrame per table, so
+joins and comparisons with the spreadsheet are pandas hash joins and
+vectorized compares rather than per-cell loops.  Edits go back as the
+list of cells that actually differ; a new column is written the same way.
+
+Usage:
+    uv run python python_js_purescript_integration/table_bridge.py https://example.com
+    uv run python python_js_purescript_integration/table_bridge.py page.html \
+        --sheet prices.csv --on Code --add-columns "Price,Stock"
+
+Once the page has loaded, type JSON commands on stdin, e.g.:
+    {"command": "list"}
+    {"command": "show", "table": 1}
+    {"command": "extract"}
+"""
+
+import argparse
+import json
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from PySide6.QtCore import QFile, QIODeviceBase, QObject, QUrl, Signal, Slot
+from PySide6.QtWidgets import QApplication
+from PySide6.QtWebChannel import QWebChannel
+from PySide6.QtWebEngineCore import QWebEngineScript
+from PySide6.QtWebEngineWidgets import QWebEngineView
+
+import event_log
+from event_log import ConsolePage
+
+HERE = Path(__file__).resolve().parent
+TABLE_BRIDGE_JS = HERE / "table_bridge.js"
+
+
+# ---------------------------------------------------------------------------
+# Frames
+# ---------------------------------------------------------------------------
+_NUMERIC_JUNK = r"[,\s$€£¥%]"
+
+
+def column_names(header):
+    """Usable, unique column names from a table's header row."""
+    names = []
+    seen = {}
+    for i, name in enumerate(header):
+        name = name or f"col{i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def coerce_columns(df, skip=()):
+    """Turn columns whose every non-empty cell is a number into numbers.
+
+    Thousands separators, currency and percent signs are ignored, so
+    "1,200" on the page matches 1200 in the spreadsheet.  Other columns,
+    and those named in ``skip``, are left as they are.
+    """
+    out = df.copy()
+    for name in out.columns:
+        if name in skip:
+            continue
+        col = out[name]
+        if pd.api.types.is_numeric_dtype(col):
+            continue
+        text = col.astype(str).str.strip()
+        blank = text.eq("")
+        cleaned = text.str.replace(_NUMERIC_JUNK, "", regex=True)
+        cleaned = cleaned.str.replace(r"^\((.*)\)$", r"-\1", regex=True)
+        numbers = pd.to_numeric(cleaned.mask(blank), errors="coerce")
+        if (~blank).any() and numbers.notna().eq(~blank).all():
+            out[name] = numbers
+    return out
+
+
+def normalise_keys(df, on):
+    """``df`` with its key columns ``on`` as comparable text.
+
+    Surrounding whitespace is stripped, inner runs of whitespace become one
+    space and thousands separators are dropped, so "1,001 " matches "1001".
+    Keys stay text on both sides, so a column of codes that happens to be
+    numeric on one side only still joins.
+    """
+    out = df.copy()
+    for name in on:
+        out[name] = (
+            out[name].astype(str).str.strip()
+            .str.replace(r"\s+", " ", regex=True)
+            .str.replace(r"(?<=\d),(?=\d{3}(?!\d))", "", regex=True)
+        )
+    return out
+
+
+def decode_table(data):
+    """One table from an onTables payload → DataFrame of the page's strings."""
+    names = column_names(data["header"])
+    return pd.DataFrame(dict(zip(names, data["columns"])), columns=names)
+
+
+# ---------------------------------------------------------------------------
+# Joins and diffs
+# ---------------------------------------------------------------------------
+def read_sheet(path):
+    """Load a spreadsheet range saved as CSV or Excel, all cells as text."""
+    path = Path(path)
+    if path.suffix.lower() in (".xlsx", ".xlsm", ".xls"):
+        df = pd.read_excel(path, dtype=str)
+    else:
+        df = pd.read_csv(path, dtype=str)
+    return df.fillna("")
+
+
+def join_frames(page, sheet, on, how="inner"):
+    """Hash join of a page table with a spreadsheet range on key columns.
+
+    Key columns are matched as text (see normalise_keys); the other columns
+    are coerced with coerce_columns.  Overlapping non-key columns get
+    ``_page`` / ``_sheet`` suffixes, and ``_merge`` says which side each
+    row came from.
+    """
+    on = [on] if isinstance(on, str) else list(on)
+    return coerce_columns(normalise_keys(page, on), skip=on).merge(
+        coerce_columns(normalise_keys(sheet, on), skip=on), on=on, how=how,
+        suffixes=("_page", "_sheet"), indicator=True,
+    )
+
+
+def compare_frames(page, sheet, on):
+    """Similarities and differences between a page table and a sheet range.
+
+    Returns a dict with:
+        matched     number of keys present on both sides
+        only_page   keys found only on the page (DataFrame)
+        only_sheet  keys found only in the sheet (DataFrame)
+        changed     {column: DataFrame of key, page value, sheet value} for
+                    the shared columns whose values differ
+    """
+    on = [on] if isinstance(on, str) else list(on)
+    merged = join_frames(page, sheet, on, how="outer")
+    both = merged[merged["_merge"] == "both"]
+    changed = {}
+    for name in page.columns:
+        if name in on or name not in sheet.columns:
+            continue
+        a, b = both[f"{name}_page"], both[f"{name}_sheet"]
+        differs = ~(a.eq(b) | (a.isna() & b.isna()))
+        if differs.any():
+            changed[name] = both.loc[differs, on + [a.name, b.name]]
+    return {
+        "matched": len(both),
+        "only_page": merged.loc[merged["_merge"] == "left_only", on],
+        "only_sheet": merged.loc[merged["_merge"] == "right_only", on],
+        "changed": changed,
+    }
+
+
+def add_columns(page, sheet, on, columns):
+    """The page table with ``columns`` from the sheet appended, matched on
+    ``on``.  Keeps the page's rows and row order; unmatched rows get ""."""
+    on = [on] if isinstance(on, str) else list(on)
+    lookup = normalise_keys(sheet[on + list(columns)], on).drop_duplicates(on)
+    keys = normalise_keys(page[on], on)
+    added = keys.merge(lookup, on=on, how="left")[list(columns)]
+    added.index = page.index
+    return pd.concat([page, added.fillna("")], axis=1)
+
+
+def cell_updates(current, new):
+    """Cells of ``new`` that differ from ``current`` (the page's strings).
+
+    Returns [[row, col, text], ...] in body coordinates plus [[-1, col,
+    name]] header cells for columns ``new`` adds past the right edge.
+    Rows beyond the page table are ignored: cells can be changed and
+    columns added, but not rows.
+    """
+    rows = min(len(current), len(new))
+    width = current.shape[1]
+    new_text = new.iloc[:rows].astype(object).where(new.iloc[:rows].notna(), "").astype(str)
+
+    old_vals = current.iloc[:rows].to_numpy(dtype=str)
+    new_vals = new_text.iloc[:, :width].to_numpy(dtype=str)
+    r, c = np.nonzero(old_vals != new_vals)
+    updates = [[int(i), int(j), str(new_vals[i, j])] for i, j in zip(r, c)]
+
+    for j in range(width, new.shape[1]):
+        updates.append([-1, j, str(new.columns[j])])
+        col = new_text.iloc[:, j].to_numpy(dtype=str)
+        updates.extend([i, j, str(col[i])] for i in range(rows))
+    return updates
+
+
+# ---------------------------------------------------------------------------
+# Backend – Python object exposed to the UserWorld JS via QWebChannel
+# ---------------------------------------------------------------------------
+class Backend(QObject):
+    # Python → JS: {"incremental": bool}
+    extractRequested = Signal(str)
+    # Python → JS: {"table": id, "cells": [[row, col, text], ...]}
+    cellsRequested = Signal(str)
+
+    def __init__(self, on_first_tables=None, parent=None):
+        super().__init__(parent)
+        self.raw = {}    # table id → DataFrame of the page's cell text
+        self.meta = {}   # table id → caption, index, headerRows
+        self._on_first_tables = on_first_tables
+
+    @Slot(str)
+    def log(self, message):
+        event_log.get_log().info("JS→Py", message)
+
+    @Slot(str)
+    def onTables(self, payload_json):
+        payload = json.loads(payload_json)
+        for table_id in payload["removed"]:
+            self.raw.pop(table_id, None)
+            self.meta.pop(table_id, None)
+        for data in payload["tables"]:
+            self.raw[data["id"]] = decode_table(data)
+            self.meta[data["id"]] = {
+                k: data[k] for k in ("index", "caption", "headerRows")
+            }
+        log = event_log.get_log()
+        if log.enabled(event_log.INFO, "TABLES"):
+            kind = "changed" if payload["incremental"] else "tables"
+            lines = [
+                f"{len(payload['tables'])} {kind}, {len(payload['removed'])} removed "
+                f"({payload['read']} of {payload['total']} read in {payload['elapsedMs']}ms, "
+                f"{len(payload_json)} bytes)"
+            ]
+            for data in payload["tables"]:
+                caption = f" {data['caption']!r}" if data["caption"] else ""
+                lines.append(f"    #{data['id']}{caption}: {data['rows']} x {data['width']}")
+            log.info("TABLES", "\n".join(lines))
+        if not payload["incremental"] and self._on_first_tables is not None:
+            callback, self._on_first_tables = self._on_first_tables, None
+            callback(self)
+
+    def frame(self, table_id):
+        """The table as a DataFrame with numeric columns coerced."""
+        return coerce_columns(self.raw[table_id])
+
+    def largest(self):
+        return max(self.raw, key=lambda t: self.raw[t].size, default=None)
+
+    def extract(self, incremental=False):
+        self.extractRequested.emit(json.dumps({"incremental": incremental}))
+
+    def write(self, table_id, new):
+        """Make the page table look like ``new`` by sending only the cells
+        that differ from what the page shows.  Returns the cell count."""
+        current = self.raw[table_id]
+        updates = cell_updates(current, new)
+        if updates:
+            self.cellsRequested.emit(json.dumps({"table": table_id, "cells": updates}))
+            # Mirror the page: the bridge does not echo our own writes
+            text = new.iloc[: len(current)].astype(object).where(new.notna(), "").astype(str)
+            text.index = current.index
+            self.raw[table_id] = text
+        return len(updates)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def read_qwebchannel_js():
+    """Read the bundled qwebchannel.js from Qt resources."""
+    f = QFile(":/qtwebchannel/qwebchannel.js")
+    if not f.open(QIODeviceBase.OpenModeFlag.ReadOnly):
+        raise RuntimeError("Failed to open qwebchannel.js from Qt resources")
+    content = f.readAll().data().decode("utf-8")
+    f.close()
+    return content
+
+
+def sheet_task(sheet, on, table, columns):
+    """Compare (and optionally extend) a page table once tables arrive."""
+    def run(backend):
+        table_id = table if table is not None else backend.largest()
+        if table_id not in backend.raw:
+            print(f"  No table {table_id} on the page", flush=True)
+            return
+        missing = [k for k in on if k not in backend.raw[table_id].columns]
+        if missing:
+            print(f"  Table #{table_id} has no column(s) {missing}: "
+                  f"{list(backend.raw[table_id].columns)}", flush=True)
+            return
+        result = compare_frames(backend.raw[table_id], sheet, on)
+        print(
+            f"  #{table_id} vs sheet on {on}: {result['matched']} matched, "
+            f"{len(result['only_page'])} only on page, "
+            f"{len(result['only_sheet'])} only in sheet",
+            flush=True,
+        )
+        for name, rows in result["changed"].items():
+            print(f"    {name}: {len(rows)} differ", flush=True)
+            print("      " + rows.head(5).to_string(index=False).replace("\n", "\n      "), flush=True)
+        if columns:
+            extended = add_columns(backend.raw[table_id], sheet, on, columns)
+            n = backend.write(table_id, extended)
+            print(f"  Added {columns} to #{table_id}: {n} cell(s) sent", flush=True)
+    return run
+
+
+def stdin_loop(backend, app):
+    """Background thread: read JSON commands from stdin."""
+    while True:
+        try:
+            line = input("\n> ").strip()
+        except EOFError:
+            print("\n  EOF — quitting.", flush=True)
+            app.quit()
+            return
+        if not line:
+            continue
+        try:
+            cmd = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"  Invalid JSON: {e}", flush=True)
+            continue
+        if not isinstance(cmd, dict):
+            print("  Expected a JSON object", flush=True)
+            continue
+        command = cmd.get("command")
+        if command == "extract":
+            backend.extract(bool(cmd.get("incremental")))
+        elif command == "list":
+            for table_id, df in backend.raw.items():
+                print(f"  #{table_id}: {df.shape[0]} x {df.shape[1]} {list(df.columns)}", flush=True)
+        elif command == "show":
+            df = backend.raw.get(cmd.get("table"))
+            print("  No such table" if df is None else df.head(20).to_string(), flush=True)
+        else:
+            print(f"  Unknown command: {command}", flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract HTML tables into pandas and join them with a spreadsheet range."
+    )
+    parser.add_argument("url", help="URL or local file to load")
+    parser.add_argument("--sheet", default=None,
+                        help="Spreadsheet range saved as CSV or Excel to compare against")
+    parser.add_argument("--on", default=None,
+                        help="Comma-separated key column(s) shared by page and sheet")
+    parser.add_argument("--table", type=int, default=None,
+                        help="Page table id to use (default: the largest)")
+    parser.add_argument("--add-columns", default=None,
+                        help="Comma-separated sheet columns to append to the page table")
+    event_log.add_arguments(parser)
+    args = parser.parse_args()
+
+    url = QUrl.fromUserInput(args.url, str(Path.cwd()))
+    if not url.isValid():
+        print(f"Invalid URL: {args.url}", file=sys.stderr)
+        sys.exit(1)
+
+    on_first_tables = None
+    if args.sheet:
+        if not args.on:
+            print("--sheet needs --on", file=sys.stderr)
+            sys.exit(1)
+        sheet = read_sheet(args.sheet)
+        on = [k.strip() for k in args.on.split(",")]
+        columns = [c.strip() for c in args.add_columns.split(",")] if args.add_columns else []
+        missing = [c for c in on + columns if c not in sheet.columns]
+        if missing:
+            print(f"Sheet has no column(s) {missing}: {list(sheet.columns)}", file=sys.stderr)
+            sys.exit(1)
+        on_first_tables = sheet_task(sheet, on, args.table, columns)
+
+    event_log.configure_from_args(args)
+    app = QApplication(sys.argv)
+
+    page = ConsolePage()
+    view = QWebEngineView()
+    view.setPage(page)
+
+    channel = QWebChannel()
+    backend = Backend(on_first_tables=on_first_tables)
+    channel.registerObject("backend", backend)
+    page.setWebChannel(channel, QWebEngineScript.ScriptWorldId.UserWorld)
+
+    qwc_script = QWebEngineScript()
+    qwc_script.setName("qwebchannel")
+    qwc_script.setWorldId(QWebEngineScript.ScriptWorldId.UserWorld)
+    qwc_script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+    qwc_script.setSourceCode(read_qwebchannel_js())
+    page.scripts().insert(qwc_script)
+
+    tables_script = QWebEngineScript()
+    tables_script.setName("table_bridge")
+    tables_script.setWorldId(QWebEngineScript.ScriptWorldId.UserWorld)
+    tables_script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
+    tables_script.setSourceCode(TABLE_BRIDGE_JS.read_text(encoding="utf-8"))
+    page.scripts().insert(tables_script)
+
+    reader = threading.Thread(target=stdin_loop, args=(backend, app), daemon=True)
+    reader.start()
+
+    print(f"Loading {url.toString()} ...", flush=True)
+    view.load(url)
+    view.resize(1024, 768)
+    view.show()
+
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
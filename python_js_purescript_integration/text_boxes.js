@@ -1,48 +1,252 @@
-function getWordBoundingBoxes(element) {
-    const range = document.createRange();
-    const boundingBoxes = [];
-
-    // Iterate over text nodes within the element
-    const textNodes = getTextNodes(element);
-    for (const textNode of textNodes) {
-        const words = textNode.textContent.split(/\s+/);
-
-        for (const word of words) {
-            // Create a range for the current word
-            range.setStart(textNode, 0);
-            range.setEnd(textNode, word.length);
-
-            // Get the bounding rectangle of the word
-            const rect = range.getBoundingClientRect();
-
-            boundingBoxes.push({
-                word: word,
-                x: rect.left,
-                y: rect.top,
-                width: rect.width,
-                height: rect.height,
-            });
+/**
+ * text_boxes.js — word geometry extraction, injected into UserWorld
+ *
+ * Walks the text under a root element and measures the bounding box of
+ * every word.  Results are packed columnar rather than one object per word:
+ *
+ *   text     all words concatenated, no separators
+ *   offsets  Uint32Array(count + 1); word i is text.slice(offsets[i], offsets[i + 1])
+ *   x, y, w, h  Float32Array(count) in document coordinates (CSS px, scroll-independent)
+ *
+ * The typed arrays are base64-encoded when sent to Python (word_boxes.py
+ * decodes them straight into numpy arrays).
+ *
+ * Per-text-node results are cached in a WeakMap:
+ *   - the word split is kept until the node's text changes (characterData)
+ *   - the geometry is tagged with a layout epoch, bumped by window resize
+ *     and by mutations that can move text: childList, characterData and
+ *     changes to the LAYOUT_ATTRIBUTES (aria-*, data-*, value and the like
+ *     are ignored, as are changes inside script and template elements)
+ *
+ * The geometry cache is all-or-nothing: one change can reflow everything
+ * after it, so any such mutation re-measures every word on the next
+ * extract.  Pages that restyle something every frame get no cache hits.
+ *
+ * Standalone use (any world):   wordGeometry.extract(element, {viewport: true})
+ * Bridge use (QWebChannel):     backend.extractRequested → backend.onWordBoxes
+ */
+(function () {
+    "use strict";
+
+    var SKIP_TAGS = { SCRIPT: 1, STYLE: 1, NOSCRIPT: 1, TEMPLATE: 1, TEXTAREA: 1 };
+    var WORD_RE = /\S+/g;
+    // Attribute changes that can move or resize text
+    var LAYOUT_ATTRIBUTES = ["style", "class", "hidden", "width", "height"];
+    // Contents never laid out as text (unlike STYLE, which restyles the page)
+    var INERT_TAGS = { SCRIPT: 1, NOSCRIPT: 1, TEMPLATE: 1 };
+
+    // Text node → { words: [start, end, ...], rects: Float32Array|null, epoch }
+    var cache = new WeakMap();
+    var layoutEpoch = 0;
+
+    function invalidate(mutations) {
+        for (var i = 0; i < mutations.length; i++) {
+            var m = mutations[i];
+            if (m.type === "characterData") {
+                cache.delete(m.target);
+            }
+            var owner = m.type === "characterData" ? m.target.parentNode : m.target;
+            if (owner && INERT_TAGS[owner.nodeName]) continue;
+            // Text edits can reflow their line; anything else can move everything
+            layoutEpoch++;
         }
     }
 
-    return boundingBoxes;
-}
-
-function getTextNodes(node) {
-    const textNodes = [];
-    if (node.nodeType === 3) {
-        // If it's a text node, add it
-        textNodes.push(node);
-    } else {
-        // Recursively traverse child nodes
-        for (const child of node.childNodes) {
-            textNodes.push(...getTextNodes(child));
+    var observer = new MutationObserver(invalidate);
+    observer.observe(document.documentElement, {
+        childList: true,
+        attributes: true,
+        attributeFilter: LAYOUT_ATTRIBUTES,
+        characterData: true,
+        subtree: true,
+    });
+    window.addEventListener("resize", function () {
+        layoutEpoch++;
+    });
+
+    function intersectsViewport(rect) {
+        return (
+            rect.bottom >= 0 &&
+            rect.right >= 0 &&
+            rect.top <= window.innerHeight &&
+            rect.left <= window.innerWidth
+        );
+    }
+
+    // [start, end, start, end, ...] for each run of non-whitespace
+    function splitWords(text) {
+        var words = [];
+        var m;
+        WORD_RE.lastIndex = 0;
+        while ((m = WORD_RE.exec(text)) !== null) {
+            words.push(m.index, m.index + m[0].length);
         }
+        return words;
     }
-    return textNodes;
-}
 
-const element = document.getElementById("content");
-const wordBoundingBoxes = getWordBoundingBoxes(element);
+    function measure(node, words, range) {
+        var rects = new Float32Array(words.length * 2);
+        var sx = window.scrollX;
+        var sy = window.scrollY;
+        for (var i = 0, j = 0; i < words.length; i += 2, j += 4) {
+            range.setStart(node, words[i]);
+            range.setEnd(node, words[i + 1]);
+            var r = range.getBoundingClientRect();
+            rects[j] = r.left + sx;
+            rects[j + 1] = r.top + sy;
+            rects[j + 2] = r.width;
+            rects[j + 3] = r.height;
+        }
+        return rects;
+    }
+
+    /**
+     * Measure every word under `root`.
+     * opts.viewport: only descend into elements that intersect the viewport
+     */
+    function extract(root, opts) {
+        opts = opts || {};
+        var t0 = performance.now();
+        root = root || document.body;
+        var viewportOnly = !!opts.viewport;
+        // Mutations made earlier in this task have not been delivered yet
+        invalidate(observer.takeRecords());
+
+        var walker = document.createTreeWalker(
+            root,
+            NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT,
+            {
+                acceptNode: function (node) {
+                    if (node.nodeType === Node.TEXT_NODE) {
+                        return NodeFilter.FILTER_ACCEPT;
+                    }
+                    if (SKIP_TAGS[node.nodeName]) {
+                        return NodeFilter.FILTER_REJECT;
+                    }
+                    if (viewportOnly && !intersectsViewport(node.getBoundingClientRect())) {
+                        return NodeFilter.FILTER_REJECT;
+                    }
+                    // Elements themselves are not reported, but walk their children
+                    return NodeFilter.FILTER_SKIP;
+                },
+            }
+        );
+
+        var range = document.createRange();
+        var entries = [];
+        var count = 0;
+        var textLength = 0;
+        var hits = 0;
+        var node;
+        while ((node = walker.nextNode())) {
+            var entry = cache.get(node);
+            if (!entry) {
+                entry = { words: splitWords(node.data), rects: null, epoch: -1 };
+                cache.set(node, entry);
+            }
+            if (entry.words.length === 0) continue;
+            if (entry.epoch === layoutEpoch) {
+                hits++;
+            } else {
+                entry.rects = measure(node, entry.words, range);
+                entry.epoch = layoutEpoch;
+            }
+            entries.push(node, entry);
+            count += entry.words.length / 2;
+        }
+        range.detach();
+
+        var parts = [];
+        var offsets = new Uint32Array(count + 1);
+        var x = new Float32Array(count);
+        var y = new Float32Array(count);
+        var w = new Float32Array(count);
+        var h = new Float32Array(count);
+        var k = 0;
+        for (var e = 0; e < entries.length; e += 2) {
+            var data = entries[e].data;
+            var words = entries[e + 1].words;
+            var rects = entries[e + 1].rects;
+            for (var i = 0, j = 0; i < words.length; i += 2, j += 4, k++) {
+                parts.push(data.slice(words[i], words[i + 1]));
+                textLength += words[i + 1] - words[i];
+                offsets[k + 1] = textLength;
+                x[k] = rects[j];
+                y[k] = rects[j + 1];
+                w[k] = rects[j + 2];
+                h[k] = rects[j + 3];
+            }
+        }
+
+        return {
+            count: count,
+            text: parts.join(""),
+            offsets: offsets,
+            x: x,
+            y: y,
+            w: w,
+            h: h,
+            nodes: entries.length / 2,
+            cachedNodes: hits,
+            elapsedMs: Math.round((performance.now() - t0) * 100) / 100,
+        };
+    }
+
+    function toBase64(typed) {
+        var bytes = new Uint8Array(typed.buffer, typed.byteOffset, typed.byteLength);
+        var chunks = [];
+        for (var i = 0; i < bytes.length; i += 0x8000) {
+            chunks.push(String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000)));
+        }
+        return btoa(chunks.join(""));
+    }
+
+    function encode(result) {
+        return {
+            count: result.count,
+            text: result.text,
+            offsets: toBase64(result.offsets),
+            x: toBase64(result.x),
+            y: toBase64(result.y),
+            w: toBase64(result.w),
+            h: toBase64(result.h),
+            nodes: result.nodes,
+            cachedNodes: result.cachedNodes,
+            elapsedMs: result.elapsedMs,
+        };
+    }
+
+    window.wordGeometry = { extract: extract, encode: encode };
+
+    // Bridge to Python when loaded into a world with a QWebChannel transport
+    if (typeof QWebChannel === "undefined" || typeof qt === "undefined") return;
+
+    new QWebChannel(qt.webChannelTransport, function (channel) {
+        var backend = channel.objects.backend;
+
+        // Request: {"id": ..., "selector": "#content", "viewport": true}
+        backend.extractRequested.connect(function (jsonStr) {
+            var request;
+            try {
+                request = JSON.parse(jsonStr);
+            } catch (err) {
+                backend.log("Failed to parse extract request: " + err);
+                return;
+            }
+            var root = request.selector
+                ? document.querySelector(request.selector)
+                : document.body;
+            if (!root) {
+                backend.log("No element matches " + request.selector);
+                return;
+            }
+            var payload = encode(extract(root, { viewport: request.viewport }));
+            payload.id = request.id === undefined ? null : request.id;
+            payload.selector = request.selector || "body";
+            backend.onWordBoxes(JSON.stringify(payload));
+        });
 
-console.log(wordBoundingBoxes); 
+        backend.log("Word geometry bridge ready");
+        if (backend.bridgeReady) backend.bridgeReady();
+    });
+})();
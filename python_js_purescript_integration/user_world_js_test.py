@@ -2,18 +2,11 @@ import sys
 from PySide6.QtCore import QFile, QIODeviceBase, QObject, Signal, Slot
 from PySide6.QtWidgets import QApplication
 from PySide6.QtWebChannel import QWebChannel
-from PySide6.QtWebEngineCore import QWebEnginePage, QWebEngineScript
+from PySide6.QtWebEngineCore import QWebEngineScript
 from PySide6.QtWebEngineWidgets import QWebEngineView
 
-
-class ConsolePage(QWebEnginePage):
-    def javaScriptConsoleMessage(self, level, message, line, source):
-        level_str = {
-            QWebEnginePage.JavaScriptConsoleMessageLevel.InfoMessageLevel: "INFO",
-            QWebEnginePage.JavaScriptConsoleMessageLevel.WarningMessageLevel: "WARNING",
-            QWebEnginePage.JavaScriptConsoleMessageLevel.ErrorMessageLevel: "ERROR",
-        }.get(level, "DEBUG")
-        print(f"[JS {level_str}] {source}:{line}: {message}")
+import event_log
+from event_log import ConsolePage
 
 
 def read_qwebchannel_js():
@@ -33,7 +26,7 @@ class Backend(QObject):
 
     @Slot(str)
     def sendData(self, data):
-        print("Backend received data:", data)
+        event_log.get_log().info("backend", "received data: %s", data)
         # Emit signal which can be picked up by the other JS world
         self.dataReceived.emit(f"From Qt: {data.upper()}")
 
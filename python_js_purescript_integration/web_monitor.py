@@ -12,26 +12,15 @@ Usage:
 
 import argparse
 import sys
-from datetime import datetime
 
 from PySide6.QtCore import QFile, QIODeviceBase, QObject, QUrl, Signal, Slot
 from PySide6.QtWidgets import QApplication
 from PySide6.QtWebChannel import QWebChannel
-from PySide6.QtWebEngineCore import QWebEnginePage, QWebEngineScript
+from PySide6.QtWebEngineCore import QWebEngineScript
 from PySide6.QtWebEngineWidgets import QWebEngineView
 
-
-# ---------------------------------------------------------------------------
-# ConsolePage – route JS console.log/warn/error to Python stdout
-# ---------------------------------------------------------------------------
-class ConsolePage(QWebEnginePage):
-    def javaScriptConsoleMessage(self, level, message, line, source):
-        level_str = {
-            QWebEnginePage.JavaScriptConsoleMessageLevel.InfoMessageLevel: "INFO",
-            QWebEnginePage.JavaScriptConsoleMessageLevel.WarningMessageLevel: "WARNING",
-            QWebEnginePage.JavaScriptConsoleMessageLevel.ErrorMessageLevel: "ERROR",
-        }.get(level, "DEBUG")
-        print(f"[JS {level_str}] {source}:{line}: {message}", flush=True)
+import event_log
+from event_log import ConsolePage
 
 
 # ---------------------------------------------------------------------------
@@ -48,14 +37,12 @@ class Backend(QObject):
     @Slot(str)
     def log(self, message):
         """General-purpose log forwarding from JS → Python."""
-        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        print(f"[JS→Py  {ts}] {message}", flush=True)
+        event_log.get_log().info("JS→Py", message)
 
     @Slot(str)
     def onMutation(self, summary):
         """Called by the MutationObserver bridge whenever the DOM changes."""
-        ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        print(f"[MUTATE {ts}] {summary}", flush=True)
+        event_log.get_log().info("MUTATE", summary)
 
 
 # ---------------------------------------------------------------------------
@@ -145,6 +132,7 @@ def main():
         description="Load a web page and log DOM mutations to Python via QWebChannel."
     )
     parser.add_argument("url", help="URL to load (e.g. https://example.com)")
+    event_log.add_arguments(parser)
     args = parser.parse_args()
 
     url = QUrl.fromUserInput(args.url)
@@ -152,6 +140,7 @@ def main():
         print(f"Invalid URL: {args.url}", file=sys.stderr)
         sys.exit(1)
 
+    event_log.configure_from_args(args)
     app = QApplication(sys.argv)
 
     # --- Page & view -----------------------------------------------------
@@ -0,0 +1,213 @@
+"""
+Load a web page and pull word bounding boxes into Python as numpy arrays.
+
+text_boxes.js is injected into UserWorld (like web_monitor.py's observer) and
+answers extract requests over QWebChannel with packed columnar data: one
+string of concatenated words, Uint32 word offsets and Float32 x/y/w/h
+columns, base64-encoded.  decode_word_boxes() turns that into numpy arrays
+without building a Python object per word.
+
+Usage:
+    uv run python python_js_purescript_integration/word_boxes.py https://example.com
+    uv run python python_js_purescript_integration/word_boxes.py page.html --selector "#content"
+
+Once the page has loaded, type JSON extract requests on stdin, e.g.:
+    {"selector": "#content"}
+    {"selector": "body", "viewport": true}
+"""
+
+import argparse
+import base64
+import json
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+from PySide6.QtCore import QFile, QIODeviceBase, QObject, QUrl, Signal, Slot
+from PySide6.QtWidgets import QApplication
+from PySide6.QtWebChannel import QWebChannel
+from PySide6.QtWebEngineCore import QWebEngineScript
+from PySide6.QtWebEngineWidgets import QWebEngineView
+
+import event_log
+from event_log import ConsolePage
+
+HERE = Path(__file__).resolve().parent
+TEXT_BOXES_JS = HERE / "text_boxes.js"
+
+
+# ---------------------------------------------------------------------------
+# Payload decoding
+# ---------------------------------------------------------------------------
+def decode_word_boxes(payload):
+    """Decode an onWordBoxes payload into words and numpy coordinate columns.
+
+    Returns a dict with ``words`` (list of str) and ``x``, ``y``, ``w``, ``h``
+    (float32 arrays, document CSS pixels).  Offsets are UTF-16 code units, as
+    in JavaScript, so the text is sliced in its UTF-16 encoding.
+    """
+    count = payload["count"]
+    offsets = np.frombuffer(base64.b64decode(payload["offsets"]), dtype="<u4")
+    columns = {
+        name: np.frombuffer(base64.b64decode(payload[name]), dtype="<f4")
+        for name in ("x", "y", "w", "h")
+    }
+    text16 = payload["text"].encode("utf-16-le")
+    bounds = (offsets * 2).tolist()
+    words = [
+        text16[bounds[i] : bounds[i + 1]].decode("utf-16-le") for i in range(count)
+    ]
+    return {"words": words, **columns}
+
+
+# ---------------------------------------------------------------------------
+# Backend – Python object exposed to the UserWorld JS via QWebChannel
+# ---------------------------------------------------------------------------
+class Backend(QObject):
+    # Python → JS: JSON extract request {"id", "selector", "viewport"}
+    extractRequested = Signal(str)
+
+    def __init__(self, initial_request=None, parent=None):
+        super().__init__(parent)
+        self._next_id = 0
+        self._initial_request = initial_request
+        self.results = {}
+
+    @Slot(str)
+    def log(self, message):
+        event_log.get_log().info("JS→Py", message)
+
+    @Slot()
+    def bridgeReady(self):
+        """Called once the UserWorld script has connected to extractRequested."""
+        if self._initial_request is not None:
+            self.request(**self._initial_request)
+
+    @Slot(str)
+    def onWordBoxes(self, payload_json):
+        payload = json.loads(payload_json)
+        boxes = decode_word_boxes(payload)
+        self.results[payload["id"]] = boxes
+        log = event_log.get_log()
+        if not log.enabled(event_log.INFO, "WORDS"):
+            return
+        lines = [
+            f"{payload['selector']}: {payload['count']} words from "
+            f"{payload['nodes']} text nodes ({payload['cachedNodes']} cached) "
+            f"in {payload['elapsedMs']}ms, {len(payload_json)} bytes"
+        ]
+        for i, word in enumerate(boxes["words"][:10]):
+            lines.append(
+                f"    {word!r:<24} x={boxes['x'][i]:7.1f} y={boxes['y'][i]:7.1f} "
+                f"w={boxes['w'][i]:6.1f} h={boxes['h'][i]:5.1f}"
+            )
+        if payload["count"] > 10:
+            lines.append(f"    ... {payload['count'] - 10} more")
+        log.info("WORDS", "\n".join(lines))
+
+    def request(self, selector=None, viewport=False):
+        """Ask the page for word boxes; the answer arrives in onWordBoxes."""
+        request_id = self._next_id
+        self._next_id += 1
+        self.extractRequested.emit(
+            json.dumps({"id": request_id, "selector": selector, "viewport": viewport})
+        )
+        return request_id
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def read_qwebchannel_js():
+    """Read the bundled qwebchannel.js from Qt resources."""
+    f = QFile(":/qtwebchannel/qwebchannel.js")
+    if not f.open(QIODeviceBase.OpenModeFlag.ReadOnly):
+        raise RuntimeError("Failed to open qwebchannel.js from Qt resources")
+    content = f.readAll().data().decode("utf-8")
+    f.close()
+    return content
+
+
+def stdin_loop(backend, app):
+    """Background thread: read JSON extract requests from stdin."""
+    while True:
+        try:
+            line = input("\n> ").strip()
+        except EOFError:
+            print("\n  EOF — quitting.", flush=True)
+            app.quit()
+            return
+        if not line:
+            continue
+        try:
+            cmd = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"  Invalid JSON: {e}", flush=True)
+            continue
+        if not isinstance(cmd, dict):
+            print("  Expected a JSON object", flush=True)
+            continue
+        backend.request(cmd.get("selector"), bool(cmd.get("viewport")))
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load a web page and extract word bounding boxes into Python."
+    )
+    parser.add_argument("url", help="URL or local file to load")
+    parser.add_argument("--selector", default=None,
+                        help="CSS selector of the root element (default: body)")
+    parser.add_argument("--viewport", action="store_true",
+                        help="Only measure words inside the viewport")
+    event_log.add_arguments(parser)
+    args = parser.parse_args()
+
+    url = QUrl.fromUserInput(args.url, str(Path.cwd()))
+    if not url.isValid():
+        print(f"Invalid URL: {args.url}", file=sys.stderr)
+        sys.exit(1)
+
+    event_log.configure_from_args(args)
+    app = QApplication(sys.argv)
+
+    page = ConsolePage()
+    view = QWebEngineView()
+    view.setPage(page)
+
+    channel = QWebChannel()
+    # First extraction as soon as the bridge is up; later ones come from stdin
+    backend = Backend(initial_request={"selector": args.selector, "viewport": args.viewport})
+    channel.registerObject("backend", backend)
+    page.setWebChannel(channel, QWebEngineScript.ScriptWorldId.UserWorld)
+
+    qwc_script = QWebEngineScript()
+    qwc_script.setName("qwebchannel")
+    qwc_script.setWorldId(QWebEngineScript.ScriptWorldId.UserWorld)
+    qwc_script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+    qwc_script.setSourceCode(read_qwebchannel_js())
+    page.scripts().insert(qwc_script)
+
+    boxes_script = QWebEngineScript()
+    boxes_script.setName("text_boxes")
+    boxes_script.setWorldId(QWebEngineScript.ScriptWorldId.UserWorld)
+    boxes_script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
+    boxes_script.setSourceCode(TEXT_BOXES_JS.read_text(encoding="utf-8"))
+    page.scripts().insert(boxes_script)
+
+    reader = threading.Thread(target=stdin_loop, args=(backend, app), daemon=True)
+    reader.start()
+
+    print(f"Loading {url.toString()} ...", flush=True)
+    view.load(url)
+    view.resize(1024, 768)
+    view.show()
+
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()